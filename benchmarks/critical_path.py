@@ -0,0 +1,82 @@
+import sys
+import os
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# time the graph topology, not the embedding model load or cached answers
+os.environ.setdefault("FAST_CLASSIFIER_ENABLED", "0")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "0")
+os.environ.setdefault("ITINERARY_STORE_ENABLED", "0")
+
+import argparse
+import statistics
+import time
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import StateGraph, END
+
+import main.agent as agent
+from fakes import FakeChatModel, FakeTavilyClient
+
+# =============================
+# CRITICAL PATH: ITINERARY INTENT
+# =============================
+# Compares the old serial topology (classify -> itinerary -> {budget, risk})
+# with the current fan-out from classify, using fixed-latency stand-ins.
+
+
+def serial_graph():
+    g = StateGraph(agent.ChatState)
+    g.add_node("classify", agent.classify_node)
+    g.add_node("itinerary", agent.itinerary_node)
+    g.add_node("budget", agent.budget_node)
+    g.add_node("risk", agent.risk_node)
+    g.add_node("combine", agent.combine_node)
+    g.set_entry_point("classify")
+    g.add_edge("classify", "itinerary")
+    g.add_edge("itinerary", "budget")
+    g.add_edge("itinerary", "risk")
+    g.add_edge(["budget", "risk"], "combine")
+    g.add_edge("combine", END)
+    return g.compile()
+
+
+def time_graph(graph, runs):
+    timings = []
+    for _ in range(runs):
+        state = {"messages": [HumanMessage(content="Plan 3 days in Jaipur")]}
+        start = time.perf_counter()
+        graph.invoke(state)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--search-latency", type=float, default=0.6)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    agent.use_clients(
+        llm=FakeChatModel(latency=args.llm_latency),
+        tavily=FakeTavilyClient(latency=args.search_latency),
+    )
+    # every run must pay for its searches, so bypass the search cache
+    agent.search_cache.get = lambda query: None
+    agent.search_cache.set = lambda query, results: None
+
+    before = time_graph(serial_graph(), args.runs)
+    after = time_graph(agent.graph, args.runs)
+
+    print(f"LLM latency: {args.llm_latency:.2f}s, search latency: {args.search_latency:.2f}s")
+    off = [f for f in ("FAST_CLASSIFIER", "SEMANTIC_CACHE", "ITINERARY_STORE") if os.environ[f + "_ENABLED"] == "0"]
+    print(f"(stand-in clients; disabled: {', '.join(off) or 'nothing'})")
+    print(f"Serial pipeline (median):  {before:.2f}s")
+    print(f"Fan-out pipeline (median): {after:.2f}s")
+    print(f"Critical path reduction:   {before - after:.2f}s ({(before - after) / before:.0%})")
+
+
+if __name__ == "__main__":
+    main()
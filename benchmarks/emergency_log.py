@@ -0,0 +1,79 @@
+import sys
+import os
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import json
+import multiprocessing
+import tempfile
+import threading
+import time
+
+from main import emergency_logger
+
+# =============================
+# BURST WRITE BENCHMARK
+# =============================
+# Several processes x threads append to one journal; every entry must land.
+
+
+def writer(path, legacy_path, process_id, threads, per_thread):
+    journal = emergency_logger.EmergencyJournal(path, legacy_path)
+
+    def run(thread_id):
+        for i in range(per_thread):
+            journal.append({
+                "user_id": f"p{process_id}-t{thread_id}-{i}",
+                "status": "OPEN",
+            })
+
+    workers = [threading.Thread(target=run, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    journal.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--per-thread", type=int, default=1000)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "emergency_logs.jsonl")
+    legacy_path = os.path.join(tmp, "emergency_logs.json")
+
+    start = time.perf_counter()
+    procs = [
+        multiprocessing.Process(
+            target=writer,
+            args=(path, legacy_path, p, args.threads, args.per_thread),
+        )
+        for p in range(args.processes)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - start
+
+    expected = args.processes * args.threads * args.per_thread
+    journal = emergency_logger.EmergencyJournal(path, legacy_path)
+    exported = journal.export_legacy_json()
+    with open(legacy_path) as f:
+        ids = {e["user_id"] for e in json.load(f)}
+
+    print(f"Appends: {expected} in {elapsed:.2f}s ({expected / elapsed:,.0f}/s)")
+    print(f"Exported: {exported}, unique: {len(ids)}, lost: {expected - len(ids)}")
+
+    if len(ids) != expected:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
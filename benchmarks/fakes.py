@@ -0,0 +1,287 @@
+import asyncio
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage
+
+# =============================
+# STAND-IN LLM + SEARCH CLIENTS
+# =============================
+# Offline replacements for ChatGroq / TavilyClient so the graph can be
+# timed without spending API quota.
+
+
+class Latency:
+    """Seconds per call: fixed, or drawn from a distribution.
+
+    Built from a number or a spec string:
+        "0.8"                 fixed
+        "uniform:0.4,1.2"     uniform between the two bounds
+        "lognormal:0.8,0.5"   median 0.8s, sigma 0.5 (long right tail)
+        "exp:0.8"             exponential with mean 0.8s
+    """
+
+    def __init__(self, spec=0.0, seed=None):
+        self.spec = str(spec)
+        self._random = random.Random(seed)
+
+        if isinstance(spec, (int, float)):
+            self.kind, self.params = "fixed", (float(spec),)
+        else:
+            kind, _, params = str(spec).partition(":")
+            if not params:
+                self.kind, self.params = "fixed", (float(kind),)
+            else:
+                self.kind = kind
+                self.params = tuple(float(p) for p in params.split(","))
+
+        if self.kind not in ("fixed", "uniform", "lognormal", "exp"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self):
+        if self.kind == "fixed":
+            return self.params[0]
+        if self.kind == "uniform":
+            return self._random.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return median * self._random.lognormvariate(0, sigma)
+        return self._random.expovariate(1 / self.params[0])
+
+
+def as_latency(latency):
+    return latency if isinstance(latency, Latency) else Latency(latency)
+
+
+class FakeBackendError(Exception):
+    """Raised by a stand-in at its configured error rate."""
+
+
+class FakeRateLimitError(FakeBackendError):
+    status_code = 429
+
+
+def _maybe_fail(error_rate, rng, rate_limited=False):
+    if error_rate and rng.random() < error_rate:
+        if rate_limited:
+            raise FakeRateLimitError("429 Too Many Requests (stand-in)")
+        raise FakeBackendError("Stand-in backend error")
+
+
+def _filler(words, seed_text=""):
+    base = (seed_text or "stand-in answer").split()
+    return " ".join(base[i % len(base)] for i in range(words))
+
+
+def _tokens(text):
+    # ~4 characters per token, close enough for sizing payloads
+    return max(1, len(text) // 4)
+
+
+# =============================
+# STRUCTURED OUTPUT
+# =============================
+
+DAYS_RE = re.compile(r"\b(\d{1,2})\s*-?\s*days?\b", re.I)
+PLACE_RE = re.compile(r"\b(?:in|to|for|visit|of)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)")
+COMPARE_RE = re.compile(r"\b([A-Z][a-z]+)\s+(?:and|vs\.?|or)\s+([A-Z][a-z]+)")
+
+
+def _question(messages):
+    human = [m.content for m in messages if getattr(m, "type", None) == "human"]
+    return human[-1] if human else ""
+
+
+def default_structured(schema, messages):
+    if schema.__name__ == "QuerySchema":
+        return schema(
+            is_travel_related=True,
+            intent="itinerary",
+            destination="Jaipur",
+            days=3,
+        )
+    return schema(has_active_risk=False)
+
+
+def keyword_structured(schema, messages):
+    """Rough keyword router so a mixed workload exercises every graph path."""
+    if schema.__name__ == "RiskSchema":
+        return schema(has_active_risk=False)
+
+    question = _question(messages)
+    lower = question.lower()
+
+    if any(w in lower for w in ("python", "java", "code", "prime minister", "medical")):
+        return schema(is_travel_related=False, intent="general")
+
+    place = PLACE_RE.search(question)
+    fields = {"destination": place.group(1) if place else None}
+
+    days = DAYS_RE.search(question)
+    pair = COMPARE_RE.search(question)
+
+    if "compare" in lower and pair:
+        intent = "comparison"
+        fields.update(place1=pair.group(1), place2=pair.group(2))
+    elif "emergency" in lower or "police" in lower or "ambulance" in lower:
+        intent = "emergency"
+    elif days or "itinerary" in lower or "plan" in lower:
+        intent = "itinerary"
+        fields["days"] = int(days.group(1)) if days else 3
+    elif "visa" in lower:
+        intent = "visa"
+    elif "hotel" in lower or "stay" in lower:
+        intent = "hotel"
+    else:
+        intent = "general"
+
+    return schema(is_travel_related=True, intent=intent, **fields)
+
+
+# =============================
+# LLM
+# =============================
+
+class FakeStructuredModel:
+    def __init__(self, parent, schema, include_raw=False):
+        self.parent = parent
+        self.schema = schema
+        self.include_raw = include_raw
+
+    def _result(self, messages):
+        parsed = self.parent.structured(self.schema, messages)
+        if not self.include_raw:
+            return parsed
+        raw = AIMessage(
+            content="",
+            usage_metadata=self.parent.usage(messages, parsed.model_dump_json()),
+        )
+        return {"raw": raw, "parsed": parsed, "parsing_error": None}
+
+    def invoke(self, messages, *args, **kwargs):
+        self.parent.before_call()
+        time.sleep(self.parent.latency.sample())
+        return self._result(messages)
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.parent.before_call()
+        await asyncio.sleep(self.parent.latency.sample())
+        return self._result(messages)
+
+    def batch(self, inputs, config=None, return_exceptions=False, **kwargs):
+        # like Runnable.batch: concurrent invokes, results in input order
+        def one(messages):
+            try:
+                return self.invoke(messages)
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                return exc
+
+        workers = (config or {}).get("max_concurrency") or len(inputs) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(one, inputs))
+
+
+class FakeChatModel:
+    """ChatGroq stand-in: invoke/ainvoke/with_structured_output.
+
+    latency is a number, spec string or Latency; error_rate is the share of
+    calls that raise (rate_limit_share of those look like a Groq 429);
+    reply_words sets the size of text answers.
+    """
+
+    def __init__(
+        self,
+        latency=0.8,
+        structured=default_structured,
+        reply="Stand-in answer.",
+        error_rate=0.0,
+        rate_limit_share=0.5,
+        reply_words=None,
+        seed=None,
+    ):
+        self.latency = as_latency(latency)
+        self.structured = structured
+        self.reply = reply
+        self.error_rate = error_rate
+        self.rate_limit_share = rate_limit_share
+        self.reply_words = reply_words
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    def before_call(self):
+        self.calls += 1
+        if self.error_rate:
+            _maybe_fail(
+                self.error_rate,
+                self._random,
+                rate_limited=self._random.random() < self.rate_limit_share,
+            )
+
+    def usage(self, messages, reply):
+        prompt = sum(_tokens(str(getattr(m, "content", m))) for m in messages)
+        completion = _tokens(reply)
+        return {
+            "input_tokens": prompt,
+            "output_tokens": completion,
+            "total_tokens": prompt + completion,
+        }
+
+    def _message(self, messages):
+        reply = _filler(self.reply_words, self.reply) if self.reply_words else self.reply
+        return AIMessage(content=reply, usage_metadata=self.usage(messages, reply))
+
+    def with_structured_output(self, schema, include_raw=False, **kwargs):
+        return FakeStructuredModel(self, schema, include_raw)
+
+    def invoke(self, messages, *args, **kwargs):
+        self.before_call()
+        time.sleep(self.latency.sample())
+        return self._message(messages)
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        self.before_call()
+        await asyncio.sleep(self.latency.sample())
+        return self._message(messages)
+
+
+# =============================
+# SEARCH
+# =============================
+
+class _FakeSearch:
+    def __init__(self, latency=0.6, error_rate=0.0, results=1, result_chars=None, seed=None):
+        self.latency = as_latency(latency)
+        self.error_rate = error_rate
+        self.results = results
+        self.result_chars = result_chars
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    def _results(self, query):
+        self.calls += 1
+        _maybe_fail(self.error_rate, self._random)
+
+        items = []
+        for i in range(self.results):
+            content = f"Stand-in result {i + 1} for {query}"
+            if self.result_chars:
+                content = (content + ". ") * (self.result_chars // (len(content) + 2) + 1)
+                content = content[:self.result_chars]
+            items.append({"content": content})
+        return {"results": items}
+
+
+class FakeTavilyClient(_FakeSearch):
+    def search(self, query, **kwargs):
+        time.sleep(self.latency.sample())
+        return self._results(query)
+
+
+class FakeAsyncTavilyClient(_FakeSearch):
+    async def search(self, query, **kwargs):
+        await asyncio.sleep(self.latency.sample())
+        return self._results(query)
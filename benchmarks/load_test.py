@@ -0,0 +1,377 @@
+import sys
+import os
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# measure the graph, not the embedding model load or cached answers
+os.environ.setdefault("FAST_CLASSIFIER_ENABLED", "0")
+os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "0")
+os.environ.setdefault("ITINERARY_STORE_ENABLED", "0")
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS
+    resource = None
+
+from langchain_core.messages import HumanMessage
+
+import main.agent as agent
+from main.search_client import SearchClient
+from fakes import FakeAsyncTavilyClient, FakeChatModel, FakeTavilyClient, keyword_structured
+from search_server import start_server
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# =============================
+# WORKLOAD
+# =============================
+# (weight, question): roughly the intent mix of evaluation/dataset.json
+
+WORKLOAD = [
+    (4, "Give me 3 day itinerary for Jaipur"),
+    (2, "Plan 5 days in Kerala on a budget"),
+    (3, "Best time to visit Goa"),
+    (2, "Compare Jaipur and Udaipur"),
+    (1, "Emergency number in Thailand"),
+    (1, "Do I need a visa for Bali"),
+    (1, "Good hotel areas to stay in Manali"),
+    (2, "Entry fee for Amber Fort"),
+    (2, "Write Python code to sort a list"),
+]
+
+
+def build_requests(count, seed):
+    rng = random.Random(seed)
+    weights = [w for w, _ in WORKLOAD]
+    questions = [q for _, q in WORKLOAD]
+    return rng.choices(questions, weights=weights, k=count)
+
+
+def _state(question):
+    return {"messages": [HumanMessage(content=question)]}
+
+
+def _call(checkpointed):
+    # checkpointed: every request is a new thread on the real checkpointer
+    if not checkpointed:
+        return agent.graph, lambda: None
+    return agent.get_graph(), lambda: {"configurable": {"thread_id": uuid.uuid4().hex}}
+
+
+def _intent(output):
+    return output.get("intent") if output.get("is_travel_related") else "non_travel"
+
+
+# =============================
+# DRIVERS
+# =============================
+
+def run_sync(questions, concurrency, checkpointed=False):
+    graph, config = _call(checkpointed)
+
+    def one(question):
+        start = time.perf_counter()
+        try:
+            output = graph.invoke(_state(question), config())
+            return time.perf_counter() - start, _intent(output), None
+        except Exception as exc:
+            return time.perf_counter() - start, None, type(exc).__name__
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, questions))
+
+
+async def _run_async(questions, concurrency, checkpointed):
+    graph, config = _call(checkpointed)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(question):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                output = await graph.ainvoke(_state(question), config())
+                return time.perf_counter() - start, _intent(output), None
+            except Exception as exc:
+                return time.perf_counter() - start, None, type(exc).__name__
+
+    try:
+        return await asyncio.gather(*(one(q) for q in questions))
+    finally:
+        # the search client keeps one connection pool per event loop
+        client = agent.get_async_tavily()
+        if hasattr(client, "aclose"):
+            await client.aclose()
+
+
+def run_async(questions, concurrency, checkpointed=False):
+    return asyncio.run(_run_async(questions, concurrency, checkpointed))
+
+
+# =============================
+# REPORT
+# =============================
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def latency_stats(values):
+    return {
+        "count": len(values),
+        "mean_ms": 1000 * sum(values) / len(values) if values else 0.0,
+        "p50_ms": 1000 * percentile(values, 0.50),
+        "p95_ms": 1000 * percentile(values, 0.95),
+        "p99_ms": 1000 * percentile(values, 0.99),
+    }
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(samples, wall_time):
+    ok = [s for s in samples if s[2] is None]
+    errors = {}
+    for _, _, error in samples:
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+
+    by_intent = {}
+    for latency, intent, _ in ok:
+        by_intent.setdefault(intent, []).append(latency)
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": (len(samples) - len(ok)) / len(samples) if samples else 0.0,
+        "wall_s": wall_time,
+        "throughput_rps": len(ok) / wall_time if wall_time else 0.0,
+        "latency": latency_stats([s[0] for s in ok]),
+        "by_intent": {k: latency_stats(v) for k, v in sorted(by_intent.items())},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def print_summary(mode, summary):
+    lat = summary["latency"]
+    print(f"\n===== {mode.upper()} =====")
+    print(f"Requests: {summary['requests']}  errors: {summary['errors'] or 'none'}")
+    print(f"Throughput: {summary['throughput_rps']:.1f} req/s  (wall {summary['wall_s']:.2f}s)")
+    print(
+        f"Latency: p50 {lat['p50_ms']:.0f} ms  p95 {lat['p95_ms']:.0f} ms  "
+        f"p99 {lat['p99_ms']:.0f} ms  mean {lat['mean_ms']:.0f} ms"
+    )
+    for intent, s in summary["by_intent"].items():
+        print(f"  {intent:<14} n={s['count']:<4} p50 {s['p50_ms']:.0f} ms  p95 {s['p95_ms']:.0f} ms")
+    if summary["peak_rss_mb"] is not None:
+        print(f"Peak RSS: {summary['peak_rss_mb']:.0f} MB")
+
+
+# =============================
+# STORED RESULTS
+# =============================
+# benchmarks/results/<commit>.json holds one entry per mode, so two commits
+# can be compared with --compare.
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def results_path(ref):
+    if os.path.exists(ref):
+        return ref
+    return os.path.join(RESULTS_DIR, f"{ref}.json")
+
+
+def save_results(commit, summaries):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = results_path(commit)
+
+    stored = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            stored = json.load(f)
+
+    for mode, summary in summaries.items():
+        stored[mode] = {
+            "commit": commit,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            **summary,
+        }
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stored, f, indent=2)
+    return path
+
+
+def compare(ref, summaries, threshold):
+    path = results_path(ref)
+    if not os.path.exists(path):
+        print(f"❌ No stored results for {ref} ({path})")
+        return False
+
+    with open(path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressed = False
+    for mode, summary in summaries.items():
+        if mode not in baseline:
+            continue
+        old = baseline[mode]
+        if old["config"] != summary["config"]:
+            print(f"⚠ {mode}: baseline used a different config, deltas are not comparable")
+
+        print(f"\n===== {mode.upper()} vs {old['commit']} =====")
+        rows = [("throughput_rps", old["throughput_rps"], summary["throughput_rps"], True)]
+        rows += [
+            (key, old["latency"][key], summary["latency"][key], False)
+            for key in ("p50_ms", "p95_ms", "p99_ms")
+        ]
+        for name, before, after, higher_is_better in rows:
+            change = (after - before) / before if before else 0.0
+            worse = -change if higher_is_better else change
+            flag = "❌" if worse > threshold else "✅"
+            regressed = regressed or worse > threshold
+            print(f"{flag} {name:<15} {before:9.1f} -> {after:9.1f}  ({change:+.0%})")
+
+    return not regressed
+
+
+# =============================
+# MAIN
+# =============================
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the agent graph")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    parser.add_argument("--llm-latency", default="lognormal:0.5,0.4",
+                        help="number or distribution spec, see fakes.Latency")
+    parser.add_argument("--search-latency", default="lognormal:0.4,0.4")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--search-error-rate", type=float, default=0.0)
+    parser.add_argument("--reply-words", type=int, default=300)
+    parser.add_argument("--search-results", type=int, default=5)
+    parser.add_argument("--result-chars", type=int, default=800)
+    parser.add_argument("--search-cache", action="store_true",
+                        help="keep the search cache (default: every request pays for search)")
+    parser.add_argument("--with-kb", action="store_true",
+                        help="query the local FAISS knowledge base (needs the embedding model)")
+    parser.add_argument("--checkpointed", action="store_true",
+                        help="run on the checkpointed graph, one new thread per request")
+    parser.add_argument("--search-server", action="store_true",
+                        help="search over HTTP against a local stand-in server with the real client")
+    parser.add_argument("--search-slow-rate", type=float, default=0.0,
+                        help="with --search-server: share of searches that take 5s (tail latency)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", action="store_true",
+                        help="store results in benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", metavar="COMMIT_OR_PATH",
+                        help="diff against stored results, exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    config = {
+        k: v for k, v in vars(args).items()
+        if k not in ("save", "compare", "threshold", "mode")
+    }
+
+    agent.use_clients(
+        llm=FakeChatModel(
+            latency=args.llm_latency,
+            structured=keyword_structured,
+            error_rate=args.llm_error_rate,
+            reply_words=args.reply_words,
+            seed=args.seed,
+        ),
+    )
+
+    search_client = None
+    if args.search_server:
+        # real client (pool, deadline, hedging, breaker) over local HTTP
+        _, _, url = start_server(
+            latency=args.search_latency,
+            error_rate=args.search_error_rate,
+            slow_rate=args.search_slow_rate,
+            results=args.search_results,
+            result_chars=args.result_chars,
+            seed=args.seed,
+        )
+        search_client = SearchClient(base_url=url)
+        agent.use_clients(tavily=search_client, async_tavily=search_client.aio)
+    else:
+        agent.use_clients(
+            tavily=FakeTavilyClient(
+                latency=args.search_latency,
+                error_rate=args.search_error_rate,
+                results=args.search_results,
+                result_chars=args.result_chars,
+                seed=args.seed,
+            ),
+            async_tavily=FakeAsyncTavilyClient(
+                latency=args.search_latency,
+                error_rate=args.search_error_rate,
+                results=args.search_results,
+                result_chars=args.result_chars,
+                seed=args.seed,
+            ),
+        )
+    if not args.search_cache:
+        agent.search_cache.get = lambda query: None
+        agent.search_cache.set = lambda query, results: None
+    if not args.with_kb:
+        agent.knowledge_context = lambda state, question: (None, None)
+
+    questions = build_requests(args.requests, args.seed)
+    modes = ["sync", "async"] if args.mode == "both" else [args.mode]
+    runners = {"sync": run_sync, "async": run_async}
+
+    summaries = {}
+    for mode in modes:
+        start = time.perf_counter()
+        samples = runners[mode](questions, args.concurrency, args.checkpointed)
+        summaries[mode] = summarize(samples, time.perf_counter() - start)
+        summaries[mode]["config"] = config
+        print_summary(mode, summaries[mode])
+
+    if search_client is not None:
+        print(f"\nSearch client: {search_client.metrics()}")
+        search_client.close()
+
+    if args.save:
+        print(f"\n✅ Results saved to: {save_results(current_commit(), summaries)}")
+
+    if args.compare and not compare(args.compare, summaries, args.threshold):
+        print("❌ Performance regression")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
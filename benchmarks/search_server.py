@@ -0,0 +1,153 @@
+import sys
+import os
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fakes import as_latency
+
+# =============================
+# STAND-IN TAVILY SERVER
+# =============================
+# Speaks the one endpoint the search client uses (POST /search), so the real
+# HTTP path (pooling, deadlines, hedging, circuit breaker) can be exercised
+# offline:
+#
+#   python benchmarks/search_server.py --port 8765 --latency lognormal:0.4,0.6
+#   TAVILY_BASE_URL=http://127.0.0.1:8765 python evaluation/run_eval.py
+
+
+class SearchBackend:
+    def __init__(
+        self,
+        latency=0.4,
+        error_rate=0.0,
+        results=5,
+        result_chars=800,
+        slow_rate=0.0,
+        slow_latency=5.0,
+        seed=None,
+    ):
+        self.latency = as_latency(latency)
+        self.slow_latency = as_latency(slow_latency)
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.results = results
+        self.result_chars = result_chars
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "slow": 0}
+
+    def handle(self, query):
+        """(status, body) for one search, after sleeping its latency."""
+        with self._lock:
+            self.stats["requests"] += 1
+            slow = self.slow_rate and self._random.random() < self.slow_rate
+            failed = self.error_rate and self._random.random() < self.error_rate
+            delay = (self.slow_latency if slow else self.latency).sample()
+            if slow:
+                self.stats["slow"] += 1
+            if failed:
+                self.stats["errors"] += 1
+
+        time.sleep(delay)
+        if failed:
+            return 503, {"detail": "Stand-in backend error"}
+
+        items = []
+        for i in range(self.results):
+            content = f"Stand-in result {i + 1} for {query}"
+            if self.result_chars:
+                content = (content + ". ") * (self.result_chars // (len(content) + 2) + 1)
+                content = content[:self.result_chars]
+            items.append({"title": f"Result {i + 1}", "url": f"https://example.com/{i + 1}", "content": content})
+        return 200, {"query": query, "results": items}
+
+
+def _handler(backend):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+        # headers and body are separate writes; without this each response
+        # waits ~40ms on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if self.path.rstrip("/") != "/search":
+                return self._send(404, {"detail": "Not found"})
+            try:
+                query = json.loads(body or b"{}")["query"]
+            except (ValueError, KeyError):
+                return self._send(400, {"detail": "Missing query"})
+            self._send(*backend.handle(query))
+
+        def _send(self, status, payload):
+            data = json.dumps(payload).encode("utf-8")
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                # the client gave up (deadline, or the other hedge won)
+                pass
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(port=0, host="127.0.0.1", **options):
+    """Serve in a daemon thread; returns (server, backend, base_url)."""
+    backend = SearchBackend(**options)
+    server = ThreadingHTTPServer((host, port), _handler(backend))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="search-server", daemon=True).start()
+    return server, backend, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Tavily search server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--latency", default="lognormal:0.4,0.4",
+                        help="number or distribution spec, see fakes.Latency")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0,
+                        help="share of requests that take --slow-latency instead")
+    parser.add_argument("--slow-latency", default="5")
+    parser.add_argument("--results", type=int, default=5)
+    parser.add_argument("--result-chars", type=int, default=800)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server, _, url = start_server(
+        port=args.port,
+        host=args.host,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+        results=args.results,
+        result_chars=args.result_chars,
+        seed=args.seed,
+    )
+    print(f"🔎 Stand-in search server on {url} (TAVILY_BASE_URL={url})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
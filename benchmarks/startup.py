@@ -0,0 +1,121 @@
+import sys
+import os
+
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import argparse
+import json
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Modules that must not be imported just by importing main.agent
+HEAVY_MODULES = [
+    "langchain_groq",
+    "retriever",
+    "langchain_huggingface",
+    "sentence_transformers",
+    "torch",
+    "faiss",
+    "numpy",
+]
+
+# =============================
+# CHILD PROCESS PROBES
+# =============================
+# Every sample runs in a fresh interpreter so nothing is already cached.
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main.agent
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"import_s": elapsed, "heavy": heavy}}))
+"""
+
+FIRST_INVOKE_PROBE = """
+import json, sys, time
+sys.path.insert(0, {bench_dir!r})
+start = time.perf_counter()
+import main.agent as agent
+from fakes import FakeChatModel, FakeTavilyClient
+from langchain_core.messages import HumanMessage
+agent.use_clients(llm=FakeChatModel(latency=0), tavily=FakeTavilyClient(latency=0))
+agent.graph.invoke({{"messages": [HumanMessage(content="Plan 3 days in Jaipur")]}})
+print(json.dumps({{"first_invoke_s": time.perf_counter() - start}}))
+"""
+
+
+def run_probe(code, env):
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for main.agent")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-first-invoke-ms", type=float, default=None)
+    parser.add_argument("--all-features", action="store_true",
+                        help="keep the fast classifier, semantic cache and itinerary store on, "
+                             "as served in production (loads the embedding model)")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        PYTHONPATH=ROOT,
+        SEARCH_CACHE_PATH=os.path.join(tmp, "search_cache.sqlite3"),
+        CHECKPOINT_PATH=os.path.join(tmp, "checkpoints.sqlite3"),
+    )
+    if args.all_features:
+        features = "all features on, as served"
+    else:
+        # keep the embedding model out of the first-invoke path
+        env.update(FAST_CLASSIFIER_ENABLED="0", SEMANTIC_CACHE_ENABLED="0", ITINERARY_STORE_ENABLED="0")
+        features = "fast classifier, semantic cache and itinerary store off"
+
+    imports, invokes, heavy = [], [], set()
+    for _ in range(args.runs):
+        probe = run_probe(IMPORT_PROBE.format(heavy=HEAVY_MODULES), env)
+        imports.append(probe["import_s"] * 1000)
+        heavy.update(probe["heavy"])
+
+        probe = run_probe(
+            FIRST_INVOKE_PROBE.format(bench_dir=os.path.dirname(os.path.abspath(__file__))),
+            env,
+        )
+        invokes.append(probe["first_invoke_s"] * 1000)
+
+    import_ms = statistics.median(imports)
+    invoke_ms = statistics.median(invokes)
+
+    print(f"import main.agent (median of {args.runs}):      {import_ms:.0f} ms")
+    print(f"import + first graph.invoke (stand-ins; {features}): {invoke_ms:.0f} ms")
+    print(f"heavy modules imported eagerly: {sorted(heavy) or 'none'}")
+
+    failed = bool(heavy)
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failed = True
+    if args.max_first_invoke_ms is not None and invoke_ms > args.max_first_invoke_ms:
+        failed = True
+
+    if failed:
+        print("❌ Startup regression")
+        sys.exit(1)
+    print("✅ Startup within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+import json
+import math
+import mmap
+import os
+import shutil
+import struct
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+# ==============================
+# COMPACT ON-DISK FORMAT
+# ==============================
+#
+# faiss_compact/
+#   CURRENT        name of the live generation, swapped in with one os.replace
+#   gen-000042/
+#     meta.json      dimension, count, index kind, nprobe
+#     index.faiss    IVF-Flat (small corpora) or IVF-PQ index, inner product
+#     docstore.bin   header | uint64 offsets[count + 1] | JSON records
+#
+# Each export writes a new generation directory, so a reader always opens
+# an index and a docstore from the same build.
+#
+# The IVF lists are opened with IO_FLAG_MMAP and the docstore is mmapped and
+# decoded one record at a time, so every worker process shares the same page
+# cache instead of holding its own unpickled copy of the corpus.
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+COMPACT_PATH = os.path.join(BASE_DIR, "faiss_compact")
+
+CURRENT = "CURRENT"
+# generations kept besides the live one, for readers that are still opening it
+KEEP_GENERATIONS = 1
+
+MAGIC = b"TDOC0001"
+HEADER = struct.Struct("<8sQ")
+
+PQ_MIN_VECTORS = int(os.getenv("COMPACT_PQ_MIN_VECTORS", "50000"))
+DEFAULT_NPROBE = int(os.getenv("COMPACT_NPROBE", "16"))
+
+
+def _normalize(vectors):
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def _nlist(count):
+    # ~sqrt(n) lists, but keep at least 39 training points per centroid
+    return max(1, min(int(math.sqrt(count)), count // 39))
+
+
+def _kind(count, dim):
+    return "ivfpq" if count >= PQ_MIN_VECTORS and dim % 8 == 0 else "ivfflat"
+
+
+def _trained_index(path, count, dim):
+    """The previous build's index, emptied, if its training still fits.
+
+    Training (k-means, plus PQ codebooks) is most of the build cost. An
+    incremental rebuild reuses it while the corpus keeps the same index
+    kind and dimension and the list count stays within 2x of the ideal.
+    """
+    current = current_dir(path)
+    if current is None:
+        return None
+    with open(os.path.join(current, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+
+    nlist = _nlist(count)
+    if (
+        meta.get("dimension") != dim
+        or meta.get("kind") != _kind(count, dim)
+        or not nlist / 2 <= meta.get("nlist", 0) <= nlist * 2
+    ):
+        return None
+
+    index = faiss.read_index(os.path.join(current, "index.faiss"))
+    index.reset()
+    return index, meta["kind"], meta["nlist"]
+
+
+def _build_index(vectors, path=COMPACT_PATH, retrain=True):
+    count, dim = vectors.shape
+    trained = None if retrain else _trained_index(path, count, dim)
+
+    if trained is not None:
+        index, kind, nlist = trained
+    else:
+        nlist = _nlist(count)
+        kind = _kind(count, dim)
+        quantizer = faiss.IndexFlatIP(dim)
+        if kind == "ivfpq":
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, dim // 8, 8, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+
+    # every vector is re-added, not only the changed ones: the docstore ids
+    # are positions in the langchain store, which shift on deletion. Adding
+    # is one pass against the centroids; training is the part worth reusing
+    index.add(vectors)
+    return index, kind, nlist
+
+
+def _write_docstore(path, records):
+    blobs = [
+        json.dumps(r, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        for r in records
+    ]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum([len(b) for b in blobs], dtype=np.uint64)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(blobs)))
+        f.write(offsets.tobytes())
+        for blob in blobs:
+            f.write(blob)
+
+
+# ==============================
+# GENERATIONS
+# ==============================
+
+def _generations(path):
+    if not os.path.isdir(path):
+        return []
+    return sorted(n for n in os.listdir(path) if n.startswith("gen-"))
+
+
+def current_dir(path=COMPACT_PATH):
+    """Directory of the live generation, or None when there is no index."""
+    try:
+        with open(os.path.join(path, CURRENT), encoding="utf-8") as f:
+            current = os.path.join(path, f.read().strip())
+    except FileNotFoundError:
+        # layout written before generations: files directly in path
+        current = path
+    return current if os.path.exists(os.path.join(current, "meta.json")) else None
+
+
+def _switch(path, name):
+    # the pointer is one small file replaced atomically
+    tmp = os.path.join(path, CURRENT + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(path, CURRENT))
+
+
+def _prune(path, keep):
+    # open readers keep their mmaps valid after the files are unlinked
+    for name in _generations(path):
+        if name not in keep:
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    for name in ("meta.json", "index.faiss", "docstore.bin"):
+        if os.path.exists(os.path.join(path, name)):
+            os.remove(os.path.join(path, name))
+
+
+def write_compact(texts, metadatas, vectors, path=COMPACT_PATH, retrain=True):
+    os.makedirs(path, exist_ok=True)
+    vectors = _normalize(vectors)
+    index, kind, nlist = _build_index(vectors, path, retrain)
+
+    generations = _generations(path)
+    number = int(generations[-1][len("gen-"):]) + 1 if generations else 1
+    name = f"gen-{number:06d}"
+    target = os.path.join(path, name)
+    os.makedirs(target)
+
+    faiss.write_index(index, os.path.join(target, "index.faiss"))
+    _write_docstore(
+        os.path.join(target, "docstore.bin"),
+        [{"page_content": t, "metadata": m} for t, m in zip(texts, metadatas)],
+    )
+    with open(os.path.join(target, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "kind": kind,
+            "dimension": int(vectors.shape[1]),
+            "count": int(vectors.shape[0]),
+            "nlist": nlist,
+            "nprobe": min(nlist, DEFAULT_NPROBE),
+        }, f, indent=2)
+
+    _switch(path, name)
+    _prune(path, keep=set(generations[-KEEP_GENERATIONS:]) | {name})
+
+
+def remove(path=COMPACT_PATH):
+    # the pointer first: without it readers treat the index as missing
+    if os.path.exists(os.path.join(path, CURRENT)):
+        os.remove(os.path.join(path, CURRENT))
+    _prune(path, keep=set())
+
+
+def export_vectorstore(vectorstore, path=COMPACT_PATH, retrain=True):
+    # langchain FAISS store -> compact format, in FAISS insertion order
+    count = vectorstore.index.ntotal
+    if count == 0:
+        # don't leave a compact copy of documents that were deleted
+        remove(path)
+        return
+
+    vectors = vectorstore.index.reconstruct_n(0, count)
+    docs = [
+        vectorstore.docstore.search(vectorstore.index_to_docstore_id[i])
+        for i in range(count)
+    ]
+    write_compact(
+        [d.page_content for d in docs],
+        [d.metadata for d in docs],
+        vectors,
+        path,
+        retrain,
+    )
+
+
+def exists(path=COMPACT_PATH):
+    return current_dir(path) is not None
+
+
+# ==============================
+# READER
+# ==============================
+
+class MappedDocstore:
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a compact docstore: {path}")
+
+        self.count = count
+        self._offsets = np.frombuffer(
+            self._mm, dtype=np.uint64, count=count + 1, offset=HEADER.size
+        )
+        self._base = HEADER.size + self._offsets.nbytes
+
+    def __len__(self):
+        return self.count
+
+    def get(self, i: int) -> Document:
+        start = self._base + int(self._offsets[i])
+        end = self._base + int(self._offsets[i + 1])
+        record = json.loads(self._mm[start:end])
+        return Document(page_content=record["page_content"], metadata=record["metadata"])
+
+
+class CompactVectorStore:
+    """Read-only, mmap-backed stand-in for the langchain FAISS store."""
+
+    def __init__(self, embeddings, path=COMPACT_PATH):
+        # resolve the generation once so all three files come from one build
+        current = current_dir(path)
+        if current is None:
+            raise FileNotFoundError(f"Compact index not found at {path}")
+        with open(os.path.join(current, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.embeddings = embeddings
+        self.index = faiss.read_index(
+            os.path.join(current, "index.faiss"),
+            faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY,
+        )
+        self.index.nprobe = self.meta["nprobe"]
+        self.docstore = MappedDocstore(os.path.join(current, "docstore.bin"))
+
+    def _select_relevance_score_fn(self):
+        # scores are squared L2 distances between unit vectors, exactly what
+        # the pickled IndexFlatL2 store returns, so thresholds carry over
+        return lambda distance: 1.0 - distance / math.sqrt(2)
+
+    def similarity_search_with_score_by_vector(self, embedding, k=4):
+        query = _normalize(np.asarray([embedding]))
+        sims, ids = self.index.search(query, k)
+
+        return [
+            (self.docstore.get(int(i)), float(2.0 - 2.0 * s))
+            for s, i in zip(sims[0], ids[0])
+            if i >= 0
+        ]
+
+    def similarity_search_with_relevance_scores(self, query, k=4):
+        relevance = self._select_relevance_score_fn()
+        hits = self.similarity_search_with_score_by_vector(
+            self.embeddings.embed_query(query), k
+        )
+        return [(doc, relevance(score)) for doc, score in hits]
+
+    def similarity_search(self, query, k=4):
+        return [doc for doc, _ in self.similarity_search_with_relevance_scores(query, k)]
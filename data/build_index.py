@@ -1,21 +1,29 @@
+import argparse
+import hashlib
+import json
 import os
-from dotenv import load_dotenv
+import sys
+import time
 
-# Load environment variables
-load_dotenv()
+# Add project root to Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-# =============================
-# LangChain Modern Imports
-# =============================
+# langchain_community, faiss and numpy (compact_index) are imported by the
+# functions that use them, so importing this module stays cheap
+
+_embeddings = None
 
-from langchain_community.vectorstores import FAISS
-from langchain_community.document_loaders import TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceEmbeddings
 
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2"
-)
+def get_embeddings():
+    # built on first use so importing this module stays cheap
+    global _embeddings
+    if _embeddings is None:
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+
+        _embeddings = HuggingFaceEmbeddings(
+            model_name="sentence-transformers/all-MiniLM-L6-v2"
+        )
+    return _embeddings
 
 
 # If using Groq only for LLM, embeddings still need OpenAI or HF
@@ -26,22 +34,29 @@ embeddings = HuggingFaceEmbeddings(
 
 DATA_FOLDER = os.path.dirname(__file__)
 FAISS_PATH = os.path.join(os.path.dirname(DATA_FOLDER), "faiss_index")
+MANIFEST_PATH = os.path.join(FAISS_PATH, "manifest.json")
+
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
 
 # =============================
 # LOAD DOCUMENTS
 # =============================
 
-def load_documents():
-    documents = []
+def list_text_files():
+    return sorted(f for f in os.listdir(DATA_FOLDER) if f.endswith(".txt"))
 
-    for filename in os.listdir(DATA_FOLDER):
-        if filename.endswith(".txt"):
-            file_path = os.path.join(DATA_FOLDER, filename)
-            print(f"📄 Loading: {filename}")
-            loader = TextLoader(file_path, encoding="utf-8")
-            documents.extend(loader.load())
 
-    return documents
+def load_file(filename):
+    from langchain_community.document_loaders import TextLoader
+
+    file_path = os.path.join(DATA_FOLDER, filename)
+    loader = TextLoader(file_path, encoding="utf-8")
+    return loader.load()
+
+
+def file_hash(filename):
+    with open(os.path.join(DATA_FOLDER, filename), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
 
 # =============================
@@ -49,6 +64,8 @@ def load_documents():
 # =============================
 
 def split_documents(documents):
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
     text_splitter = RecursiveCharacterTextSplitter(
         chunk_size=500,
         chunk_overlap=100
@@ -57,37 +74,177 @@ def split_documents(documents):
     return text_splitter.split_documents(documents)
 
 
+def chunk_ids(filename, chunks):
+    # content-addressed ids: unchanged chunks keep their id across rebuilds
+    ids = []
+    seen = {}
+
+    for chunk in chunks:
+        digest = hashlib.sha256(
+            f"{filename}\0{chunk.page_content}".encode("utf-8")
+        ).hexdigest()
+        seen[digest] = seen.get(digest, 0) + 1
+        ids.append(digest if seen[digest] == 1 else f"{digest}-{seen[digest]}")
+
+    return ids
+
+
+# =============================
+# MANIFEST
+# =============================
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_PATH) or not os.path.exists(
+        os.path.join(FAISS_PATH, "index.faiss")
+    ):
+        return None
+
+    with open(MANIFEST_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest):
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+# =============================
+# EMBED IN BATCHES
+# =============================
+
+def add_chunks(vectorstore, chunks, ids):
+    from langchain_community.vectorstores import FAISS
+
+    for start in range(0, len(chunks), EMBED_BATCH_SIZE):
+        batch = chunks[start:start + EMBED_BATCH_SIZE]
+        batch_ids = ids[start:start + EMBED_BATCH_SIZE]
+        texts = [c.page_content for c in batch]
+        vectors = get_embeddings().embed_documents(texts)
+
+        if vectorstore is None:
+            vectorstore = FAISS.from_embeddings(
+                list(zip(texts, vectors)),
+                get_embeddings(),
+                metadatas=[c.metadata for c in batch],
+                ids=batch_ids,
+            )
+        else:
+            vectorstore.add_embeddings(
+                list(zip(texts, vectors)),
+                metadatas=[c.metadata for c in batch],
+                ids=batch_ids,
+            )
+
+        print(f"🔹 Embedded {start + len(batch)}/{len(chunks)} chunks")
+
+    return vectorstore
+
+
 # =============================
 # BUILD FAISS INDEX
 # =============================
 
-def build_faiss_index():
+def build_faiss_index(full=False, compact=True):
+    import compact_index
+    from dotenv import load_dotenv
+    from langchain_community.vectorstores import FAISS
+
+    # Load environment variables
+    load_dotenv()
 
     print("🚀 Starting FAISS index build...")
+    started = time.perf_counter()
 
-    docs = load_documents()
+    files = list_text_files()
+    manifest = None if full else load_manifest()
 
-    if not docs:
+    if not files and manifest is None:
         print("❌ No .txt files found inside data/ folder.")
         return
 
-    split_docs = split_documents(docs)
+    if manifest is None:
+        print("🔹 Full rebuild")
+        old_files = {}
+        vectorstore = None
+    else:
+        print("🔹 Incremental rebuild")
+        old_files = manifest["files"]
+        vectorstore = FAISS.load_local(
+            FAISS_PATH,
+            get_embeddings(),
+            allow_dangerous_deserialization=True
+        )
+
+    new_files = {}
+    new_chunks, new_ids, stale_ids = [], [], []
+
+    for filename in files:
+        digest = file_hash(filename)
+        previous = old_files.get(filename)
+
+        if previous and previous["sha256"] == digest:
+            new_files[filename] = previous
+            continue
+
+        print(f"📄 Loading: {filename}")
+        chunks = split_documents(load_file(filename))
+        ids = chunk_ids(filename, chunks)
+
+        old_ids = set(previous["chunks"]) if previous else set()
+        keep = set(ids)
+
+        for chunk, chunk_id in zip(chunks, ids):
+            if chunk_id not in old_ids:
+                new_chunks.append(chunk)
+                new_ids.append(chunk_id)
+        stale_ids.extend(i for i in old_ids if i not in keep)
+
+        new_files[filename] = {"sha256": digest, "chunks": ids}
+
+    for filename, previous in old_files.items():
+        if filename not in new_files:
+            print(f"🗑 Removed: {filename}")
+            stale_ids.extend(previous["chunks"])
+
+    print(
+        f"🔹 Chunks to embed: {len(new_chunks)}, "
+        f"chunks to delete: {len(stale_ids)}"
+    )
+
+    if vectorstore is not None and stale_ids:
+        vectorstore.delete(stale_ids)
 
-    print(f"🔹 Total chunks created: {len(split_docs)}")
+    vectorstore = add_chunks(vectorstore, new_chunks, new_ids)
+
+    if vectorstore is None:
+        print("❌ No chunks created from data/ folder.")
+        return
 
-    # Create embeddings
-    embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2"
-)
+    if not files:
+        # every document was removed; the deletes above emptied the index
+        print("🗑 No .txt files left, index is now empty")
 
+    changed = bool(new_chunks or stale_ids or manifest is None)
 
-    # Build FAISS
-    vectorstore = FAISS.from_documents(split_docs, embeddings)
+    if changed:
+        # Save locally
+        vectorstore.save_local(FAISS_PATH)
 
-    # Save locally
-    vectorstore.save_local(FAISS_PATH)
+    save_manifest({"files": new_files})
 
-    print(f"✅ FAISS index saved at: {FAISS_PATH}")
+    elapsed = time.perf_counter() - started
+    print(f"✅ FAISS index saved at: {FAISS_PATH} ({elapsed:.1f}s)")
+
+    if compact and (changed or not compact_index.exists()):
+        # a full rebuild retrains the IVF centroids; otherwise the previous
+        # build's training is reused and only the vectors are re-added
+        compact_index.export_vectorstore(vectorstore, retrain=manifest is None)
+        if compact_index.exists():
+            print(f"✅ Compact index saved at: {compact_index.COMPACT_PATH}")
+        else:
+            print(f"🗑 Compact index removed: {compact_index.COMPACT_PATH}")
 
 
 # =============================
@@ -95,4 +252,17 @@ def build_faiss_index():
 # =============================
 
 if __name__ == "__main__":
-    build_faiss_index()
+    parser = argparse.ArgumentParser(description="Build the FAISS index")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="re-embed every chunk instead of only new or changed ones",
+    )
+    parser.add_argument(
+        "--no-compact",
+        action="store_true",
+        help="skip writing the mmap-friendly faiss_compact/ copy",
+    )
+    args = parser.parse_args()
+
+    build_faiss_index(full=args.full, compact=not args.no_compact)
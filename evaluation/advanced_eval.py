@@ -1,5 +1,5 @@
 from langchain_core.messages import HumanMessage
-from main.agent import llm
+from main.agent import get_llm
 
 
 def llm_quality_score(question, answer):
@@ -22,7 +22,8 @@ Answer: {answer}
 Return only a number.
 """
 
-    response = llm.invoke([HumanMessage(content=prompt)])
+    # the judge runs on its own tier (LLM_ROUTE_JUDGE), not the agent's model
+    response = get_llm("judge").invoke([HumanMessage(content=prompt)])
     return response.content.strip()
 
 
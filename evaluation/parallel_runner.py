@@ -0,0 +1,223 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# =============================
+# CONFIG
+# =============================
+
+DEFAULT_CONCURRENCY = int(os.getenv("EVAL_CONCURRENCY", "8"))
+MAX_RETRIES = int(os.getenv("EVAL_MAX_RETRIES", "5"))
+BASE_BACKOFF = float(os.getenv("EVAL_BASE_BACKOFF", "1.0"))
+MAX_BACKOFF = float(os.getenv("EVAL_MAX_BACKOFF", "30.0"))
+
+# =============================
+# RATE-LIMIT AWARE BACKOFF
+# =============================
+# One 429 pauses every worker, not just the one that hit it, so we back off
+# as a group instead of hammering Groq with the remaining workers.
+#
+# Single calls are retried, never a whole example: with_backoff around the
+# judge, invoke_with_backoff around graph.invoke. The latter retries on a
+# fresh thread, because the failed run may already have appended the
+# question to the conversation's thread.
+
+_cooldown_until = 0.0
+_cooldown_lock = threading.Lock()
+
+
+def is_rate_limited(exc) -> bool:
+    if "ratelimit" in type(exc).__name__.lower():
+        return True
+    if getattr(exc, "status_code", None) == 429:
+        return True
+    text = str(exc).lower()
+    return "429" in text or "rate limit" in text or "too many requests" in text
+
+
+def _retry_after(exc):
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _cool_down(seconds):
+    global _cooldown_until
+    with _cooldown_lock:
+        _cooldown_until = max(_cooldown_until, time.monotonic() + seconds)
+
+
+def _wait_for_cooldown():
+    while True:
+        remaining = _cooldown_until - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(remaining)
+
+
+def _back_off(exc, attempts):
+    delay = _retry_after(exc) or min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (attempts - 1))
+    _cool_down(delay + random.uniform(0, BASE_BACKOFF))
+
+
+def with_backoff(call, *args, max_retries=MAX_RETRIES, **kwargs):
+    """call(*args, **kwargs), retried on 429 after the shared cool-down."""
+    attempts = 0
+    while True:
+        _wait_for_cooldown()
+        attempts += 1
+        try:
+            return call(*args, **kwargs)
+        except Exception as exc:
+            if not is_rate_limited(exc) or attempts > max_retries:
+                raise
+            _back_off(exc, attempts)
+
+
+def invoke_with_backoff(graph, state, thread_id, max_retries=MAX_RETRIES):
+    """graph.invoke on a checkpointed thread, retried on 429.
+
+    A retry runs on a new thread seeded with the messages the thread had
+    before the failed attempt. Returns (output, thread_id); later turns of
+    the conversation continue on the returned thread.
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    before = graph.get_state(config).values.get("messages", [])
+    seeded = {**state, "messages": list(before) + list(state["messages"])}
+    attempts = 0
+    while True:
+        _wait_for_cooldown()
+        attempts += 1
+        try:
+            return graph.invoke(state, config), config["configurable"]["thread_id"]
+        except Exception as exc:
+            if not is_rate_limited(exc) or attempts > max_retries:
+                raise
+            _back_off(exc, attempts)
+        config = {"configurable": {"thread_id": f"{thread_id}_retry{attempts}"}}
+        state = seeded
+
+
+def _run_one(fn, index, example, session):
+    _wait_for_cooldown()
+    start = time.perf_counter()
+
+    try:
+        output = fn(index, example, session)
+    except Exception as exc:
+        if is_rate_limited(exc):
+            # not retried, but the other workers still slow down
+            _back_off(exc, 1)
+        return {
+            "index": index,
+            "example": example,
+            "output": None,
+            "error": f"{type(exc).__name__}: {exc}",
+            "latency": time.perf_counter() - start,
+        }
+
+    output = output or {}
+    return {
+        "index": index,
+        "example": example,
+        "output": output,
+        "error": None,
+        "latency": output.get("latency", time.perf_counter() - start),
+    }
+
+
+def sessions(dataset):
+    """Group examples into conversations.
+
+    An example whose type ends in "_followup" continues the conversation of
+    the example before it ("I prefer INR" -> "Give me budget for Goa").
+    """
+    chains = []
+    for i, example in enumerate(dataset):
+        if chains and example.get("type", "").endswith("_followup"):
+            chains[-1].append(i)
+        else:
+            chains.append([i])
+    return chains
+
+
+def _run_session(fn, dataset, chain):
+    # turns of one conversation run in order, on one worker
+    return [_run_one(fn, i, dataset[i], chain[0]) for i in chain]
+
+
+def run_parallel(dataset, fn, concurrency=DEFAULT_CONCURRENCY, on_result=None):
+    """Run fn(index, example, session) over the dataset with bounded concurrency.
+
+    session is the index of the conversation's first example; use it for the
+    thread_id. fn returns a dict; a "latency" key overrides the measured wall
+    time (e.g. to exclude the judge call). Results come back in dataset order.
+    fn is run once per example; wrap its rate-limited calls in with_backoff.
+    """
+    results = [None] * len(dataset)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [
+            pool.submit(_run_session, fn, dataset, chain)
+            for chain in sessions(dataset)
+        ]
+        for future in futures:
+            for result in future.result():
+                results[result["index"]] = result
+                if on_result:
+                    on_result(result)
+
+    return results
+
+
+# =============================
+# LATENCY SUMMARY
+# =============================
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    rank = q * (len(values) - 1)
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def latency_summary(values):
+    return {
+        "count": len(values),
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def latency_by_intent(results):
+    by_intent = {}
+    for r in results:
+        intent = (r["output"] or {}).get("intent") or r["example"].get("type") or "unknown"
+        by_intent.setdefault(intent, []).append(r["latency"])
+    return {intent: latency_summary(v) for intent, v in sorted(by_intent.items())}
+
+
+def print_latency_report(results, wall_time):
+    overall = latency_summary([r["latency"] for r in results])
+
+    print("\n===== LATENCY =====")
+    print(f"Wall time: {wall_time:.2f}s for {len(results)} examples")
+    print(
+        f"Per example: p50 {overall['p50']:.2f}s  p95 {overall['p95']:.2f}s  "
+        f"p99 {overall['p99']:.2f}s"
+    )
+    for intent, s in latency_by_intent(results).items():
+        print(
+            f"  {intent:<12} n={s['count']:<3} p50 {s['p50']:.2f}s  "
+            f"p95 {s['p95']:.2f}s  p99 {s['p99']:.2f}s"
+        )
@@ -2,11 +2,23 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import argparse
 import json
+import time
+import uuid
 from langchain_core.messages import HumanMessage
-from main.agent import graph
+from main.agent import get_graph
 from advanced_eval import llm_quality_score
 from metrics import update_confusion_matrix
+from parallel_runner import DEFAULT_CONCURRENCY, invoke_with_backoff, print_latency_report, run_parallel, with_backoff
+
+parser = argparse.ArgumentParser(description="Advanced evaluation")
+parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+args = parser.parse_args()
+
+RUN_ID = uuid.uuid4().hex[:8]
+# session -> thread id its conversation continues on
+threads = {}
 
 # =============================
 # LOAD DATASET
@@ -25,12 +37,12 @@ safety_failures = 0
 hallucination_warnings = 0
 
 # =============================
-# EVALUATION LOOP
+# EVALUATE ONE EXAMPLE
 # =============================
+# Runs on a worker thread; everything that touches the counters below
+# happens afterwards, in dataset order.
 
-for example in dataset:
-
-    print(f"\n🔍 Testing: {example['input']}")
+def evaluate(index, example, session):
 
     state = {
         "user_id": "eval_user",
@@ -39,12 +51,45 @@ for example in dataset:
         "allowed": True
     }
 
-    result = graph.invoke(
-        state,
-        config={"configurable": {"thread_id": "eval_user"}}
-    )
+    start = time.perf_counter()
+    # one checkpointed thread per conversation, fresh for every run; a
+    # rate-limited turn is retried on a new thread the session then keeps
+    thread_id = threads.get(session, f"eval_{RUN_ID}_{session}")
+    result, threads[session] = invoke_with_backoff(get_graph(), state, thread_id)
+    latency = time.perf_counter() - start
 
     response = result["messages"][-1].content.lower()
+    score = with_backoff(llm_quality_score, example["input"], response)
+
+    return {
+        "response": response,
+        "score": score,
+        "latency": latency,
+        "intent": result.get("intent") if result.get("is_travel_related") else "non_travel",
+    }
+
+
+# =============================
+# EVALUATION LOOP
+# =============================
+
+started = time.perf_counter()
+runs = run_parallel(dataset, evaluate, concurrency=args.concurrency)
+wall_time = time.perf_counter() - started
+
+errors = 0
+
+for run in runs:
+
+    example = run["example"]
+    print(f"\n🔍 Testing: {example['input']}")
+
+    if run["error"]:
+        errors += 1
+        print(f"❌ ERROR: {run['error']}")
+        continue
+
+    response = run["output"]["response"]
 
     # =============================
     # STRONG SAFETY REGRESSION
@@ -84,10 +129,8 @@ for example in dataset:
     # LLM QUALITY SCORE
     # =============================
 
-    score = llm_quality_score(example["input"], response)
-
     try:
-        quality_scores.append(int(score))
+        quality_scores.append(int(run["output"]["score"]))
     except:
         quality_scores.append(3)
 
@@ -121,3 +164,6 @@ avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0
 print("Average LLM Quality Score:", round(avg_quality, 2))
 print("Safety Failures:", safety_failures)
 print("Hallucination Warnings:", hallucination_warnings)
+print("Errors:", errors)
+
+print_latency_report(runs, wall_time)
@@ -3,20 +3,29 @@ import os
 
 # Add project root to Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import argparse
 import json
+import time
+import uuid
 from langchain_core.messages import HumanMessage
-from main.agent import graph
+from main.agent import get_graph
+from parallel_runner import DEFAULT_CONCURRENCY, invoke_with_backoff, print_latency_report, run_parallel
 
+parser = argparse.ArgumentParser(description="Keyword evaluation")
+parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+args = parser.parse_args()
+
+
+RUN_ID = uuid.uuid4().hex[:8]
+# session -> thread id its conversation continues on
+threads = {}
 
 # Load dataset
-with open("evaluation/dataset.json", "r") as f:
+with open("evaluation/dataset.json", "r", encoding="utf-8") as f:
     dataset = json.load(f)
 
-results = []
-
-for example in dataset:
-    print(f"\n🔍 Testing: {example['input']}")
 
+def evaluate(index, example, session):
     state = {
         "user_id": "eval_user",
         "messages": [HumanMessage(content=example["input"])],
@@ -24,22 +33,48 @@ for example in dataset:
         "allowed": True
     }
 
-    output = graph.invoke(
-        state,
-        config={"configurable": {"thread_id": "eval_user"}}
-    )
+    start = time.perf_counter()
+    # one checkpointed thread per conversation, fresh for every run; a
+    # rate-limited turn is retried on a new thread the session then keeps
+    thread_id = threads.get(session, f"eval_{RUN_ID}_{session}")
+    output, threads[session] = invoke_with_backoff(get_graph(), state, thread_id)
+    latency = time.perf_counter() - start
 
     response = output["messages"][-1].content.lower()
+    passed = any(
+        keyword.lower() in response
+        for keyword in example["expected_contains"]
+    )
+
+    return {
+        "passed": passed,
+        "latency": latency,
+        "intent": output.get("intent") if output.get("is_travel_related") else "non_travel",
+    }
 
-    passed = any(keyword.lower() in response for keyword in example["expected_contains"])
+
+started = time.perf_counter()
+runs = run_parallel(dataset, evaluate, concurrency=args.concurrency)
+wall_time = time.perf_counter() - started
+
+results = []
+
+for run in runs:
+    example = run["example"]
+    print(f"\n🔍 Testing: {example['input']}")
+
+    if run["error"]:
+        print(f"❌ ERROR: {run['error']}")
+        passed = False
+    else:
+        passed = run["output"]["passed"]
+        print("✅ PASS" if passed else "❌ FAIL")
 
     results.append({
         "input": example["input"],
         "passed": passed
     })
 
-    print("✅ PASS" if passed else "❌ FAIL")
-
 # Summary
 total = len(results)
 passed = sum(1 for r in results if r["passed"])
@@ -48,3 +83,5 @@ print("\n======================")
 print(f"Total: {total}")
 print(f"Passed: {passed}")
 print(f"Accuracy: {(passed/total)*100:.2f}%")
+
+print_latency_report(runs, wall_time)
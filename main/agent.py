@@ -1,26 +1,121 @@
+import asyncio
 import os
+import threading
+import time
 from typing import TypedDict, List, Optional
 from typing_extensions import Annotated
 from operator import add
 from enum import Enum
 
-from dotenv import load_dotenv
 from pydantic import BaseModel
 from langchain_core.messages import BaseMessage, AIMessage, SystemMessage
-from langchain_groq import ChatGroq
+from langchain_core.runnables import RunnableLambda
+from langgraph.config import get_stream_writer
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import StateGraph, END
-from tavily import TavilyClient
 
+from main import compression, context, instrumentation, models, prefetch
+from main.emergency_numbers import emergency_answer
+from main.place_index import answer_question
+from main.search_cache import search_cache
 
-load_dotenv()
+instrumentation.register_collector("search_cache", lambda: search_cache.stats)
 
-llm = ChatGroq(
-    api_key=os.getenv("GROQ_API_KEY"),
-    model="llama-3.1-8b-instant",
-    temperature=0.2,
-)
+# =============================
+# CLIENTS (built on first use)
+# =============================
+# langchain_groq and the search client (httpx) are imported inside the
+# factories so that importing this module (LangGraph server, eval scripts)
+# stays cheap.
+
+_clients = {}
+_clients_lock = threading.Lock()
+_env_loaded = False
+
+
+def load_env():
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _env_loaded = True
+
+
+def _make_llm():
+    # per-node models live in main.models; this is the default tier
+    return models.get_model()
+
+
+def _make_tavily():
+    from main.search_client import get_search_client
+
+    return get_search_client()
+
+
+def _make_async_tavily():
+    # same connection pool and circuit breaker as the sync client
+    from main.search_client import get_search_client
+
+    return get_search_client().aio
+
+
+CLIENT_FACTORIES = {
+    "llm": _make_llm,
+    "tavily": _make_tavily,
+    "async_tavily": _make_async_tavily,
+}
+
+
+def get_client(name: str):
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                load_env()
+                client = _clients[name] = CLIENT_FACTORIES[name]()
+    return client
+
+
+def get_llm(node=None):
+    if node is None:
+        return get_client("llm")
+    load_env()
+    return models.runnable_for(node)
+
+
+def get_tavily():
+    return get_client("tavily")
+
+
+def get_async_tavily():
+    return get_client("async_tavily")
+
+
+def use_clients(**clients):
+    # swap in stand-ins, e.g. use_clients(llm=fake_llm, tavily=fake_tavily)
+    unknown = set(clients) - set(CLIENT_FACTORIES)
+    if unknown:
+        raise ValueError(f"Unknown clients: {sorted(unknown)}")
+    replaced = [_clients.get(name) for name in clients]
+    _clients.update(clients)
+    for old in replaced:
+        # close pooled connections of a replaced client nothing else uses
+        in_use = any(c is old or getattr(c, "client", None) is old for c in _clients.values())
+        if old is not None and not in_use and hasattr(old, "close"):
+            old.close()
+    if "llm" in clients:
+        # a stand-in LLM serves every node
+        models.use_model(clients["llm"])
+
+
+def __getattr__(name):
+    # keeps `from main.agent import llm` working without eager construction
+    if name in CLIENT_FACTORIES:
+        return get_client(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-tavily = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
 class IntentType(str, Enum):
     itinerary = "itinerary"
@@ -32,8 +127,17 @@ class IntentType(str, Enum):
     general = "general"
 
 
+# messages kept per checkpointed thread; nodes only read a token-budgeted
+# window of them (main.context), the rest would grow the checkpoint forever
+MAX_MESSAGES = int(os.getenv("CHECKPOINT_MAX_MESSAGES", "40"))
+
+
+def add_recent(left, right):
+    return add(left, right)[-MAX_MESSAGES:]
+
+
 class ChatState(TypedDict, total=False):
-    messages: Annotated[List[BaseMessage], add]
+    messages: Annotated[List[BaseMessage], add_recent]
     is_travel_related: bool
     intent: str
     destination: Optional[str]
@@ -44,7 +148,11 @@ class ChatState(TypedDict, total=False):
     itinerary_text: Optional[str]
     budget_text: Optional[str]
     risk_text: Optional[str]
-    combined: Optional[bool]
+    direct_answer: Optional[str]
+    cached_answer: Optional[str]
+    prefetch_id: Optional[str]
+    answer_source: Optional[str]
+    retrieval_score: Optional[float]
 
 class QuerySchema(BaseModel):
     is_travel_related: bool
@@ -68,31 +176,134 @@ def extract_text(message):
     return str(message)
 
 
-def search(query: str) -> str:
+def _search_text(contents, query: str, purpose=None, question=None) -> str:
+    if not compression.ENABLED:
+        return "\n".join(contents)[:4000]
+    # purpose ("budget", "advisory") adds what the node is looking for
+    return compression.compress(contents, f"{question or ''} {query}", purpose)
+
+
+def _cache_results(query: str, result) -> list:
+    contents = [r.get("content", "") for r in result.get("results", [])]
+    if contents:
+        search_cache.set(query, contents)
+    return contents
+
+
+def search(query: str, purpose=None, question=None) -> str:
+    started = time.perf_counter()
+    contents = search_cache.get(query)
+    cached = contents is not None
+
+    if not cached:
+        try:
+            result = get_tavily().search(
+                query=query,
+                search_depth="advanced",
+                max_results=5
+            )
+        except Exception as exc:
+            instrumentation.record_search_error(time.perf_counter() - started, exc)
+            return ""
+
+        contents = _cache_results(query, result)
+
+    instrumentation.record_search(time.perf_counter() - started, cached, contents)
+    return _search_text(contents, query, purpose, question)
+
+
+async def asearch(query: str, purpose=None, question=None) -> str:
+    started = time.perf_counter()
+    # only the in-memory tier on the loop; SQLite reads and commits go to a thread
+    contents = search_cache.get_memory(query)
+    if contents is None:
+        contents = await asyncio.to_thread(search_cache.get, query)
+    cached = contents is not None
+
+    if not cached:
+        try:
+            result = await get_async_tavily().search(
+                query=query,
+                search_depth="advanced",
+                max_results=5
+            )
+        except Exception as exc:
+            instrumentation.record_search_error(time.perf_counter() - started, exc)
+            return ""
+
+        contents = await asyncio.to_thread(_cache_results, query, result)
+
+    instrumentation.record_search(time.perf_counter() - started, cached, contents)
+    return _search_text(contents, query, purpose, question)
+
+
+def knowledge_context(state: ChatState, question: str):
+    # the knowledge base has no emergency numbers, go straight to search
+    if state.get("intent") == "emergency":
+        return None, None
+
     try:
-        result = tavily.search(
-            query=query,
-            search_depth="advanced",
-            max_results=5
-        )
-        return "\n".join(
-            r.get("content", "") for r in result.get("results", [])
-        )[:4000]
+        import retriever
+
+        return retriever.retrieve_context(question)
     except Exception:
-        return ""
+        return None, None
 
 
-def call_llm(state: ChatState, prompt: str, schema=None):
-    model = llm.with_structured_output(schema) if schema else llm
-    return model.invoke(
-        state["messages"] + [SystemMessage(content=prompt)]
-    )
+def _source(name: str, score):
+    return {"answer_source": name, "retrieval_score": score}
 
 
-def classify_node(state: ChatState):
-    result = call_llm(
-        state,
-        """
+def _llm_request(state: ChatState, prompt: str, schema=None, stream=False, node=None):
+    load_env()
+    # the node's tier model, with structured output and fallback bound once;
+    # include_raw keeps the raw message so its token usage can be recorded
+    model = models.runnable_for(node, schema, include_raw=bool(schema) and instrumentation.ENABLED)
+    # only user-facing text is streamed in "messages" mode; classifier, risk
+    # and budget calls are tagged out of the token stream
+    config = None if stream else {"tags": [TAG_NOSTREAM]}
+    # each node sees only the recent turns its budget allows
+    return model, context.build_messages(state["messages"], prompt, node), config
+
+
+def _llm_result(result, started: float):
+    if isinstance(result, dict) and "parsing_error" in result:
+        instrumentation.record_llm(time.perf_counter() - started, result["raw"], structured=True)
+        if result["parsing_error"] is not None:
+            raise result["parsing_error"]
+        return result["parsed"]
+
+    instrumentation.record_llm(time.perf_counter() - started, result)
+    return result
+
+
+def call_llm(state: ChatState, prompt: str, schema=None, stream=False, node=None):
+    model, messages, config = _llm_request(state, prompt, schema, stream, node)
+    started = time.perf_counter()
+    return _llm_result(model.invoke(messages, config), started)
+
+
+async def acall_llm(state: ChatState, prompt: str, schema=None, stream=False, node=None):
+    model, messages, config = _llm_request(state, prompt, schema, stream, node)
+    started = time.perf_counter()
+    return _llm_result(await model.ainvoke(messages, config), started)
+
+
+def emit_section(section: str, text: str):
+    # "custom" stream mode: lets clients render each itinerary section as
+    # soon as its branch finishes instead of waiting for combine_node
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return
+    writer({"section": section, "text": text})
+
+
+# =============================
+# PROMPTS
+# =============================
+
+CLASSIFY_PROMPT = """
         You are a STRICT travel query classifier.
 
         Always return all required fields.
@@ -114,93 +325,87 @@ def classify_node(state: ChatState):
         SOS or emergency numbers → intent MUST be emergency.
 
         Return structured output only.
-        """,
-        QuerySchema,
-    )
+        """
 
-    data = result.model_dump()
+
+# per-turn fields: reset by classify so nothing carries over to the next
+# turn of a checkpointed thread
+TURN_DEFAULTS = {
+    "itinerary_text": None,
+    "budget_text": None,
+    "risk_text": None,
+    "direct_answer": None,
+    "cached_answer": None,
+    "prefetch_id": None,
+    "answer_source": None,
+    "retrieval_score": None,
+}
+
+
+def _classify_result(result):
+    data = {**TURN_DEFAULTS, **result.model_dump()}
     data["intent"] = data["intent"].value
     return data
 
 
-def route_query(state: ChatState):
-    return state.get("intent") if state.get("is_travel_related") else "non_travel"
+def _direct_answer(state: ChatState, data: dict):
+    # single-field facts ("timings for Bara Imambara") need no further LLM
+    # call or search; only for questions already classified as travel, so
+    # "write code to list hotels in Jaipur" is still rejected
+    if not data.get("is_travel_related") or data.get("intent") == "itinerary":
+        return None
 
-def itinerary_node(state: ChatState):
-    destination = state.get("destination")
-    days = state.get("days", 3)
+    hit = answer_question(extract_text(state["messages"][-1]))
+    if not hit:
+        return None
+    return {**data, "destination": hit["place"], "direct_answer": hit["text"]}
 
-    response = call_llm(
-        state,
-        f"Create a {days}-day travel itinerary for {destination}. No pricing."
-    )
 
-    return {"itinerary_text": response.content}
+def _after_classify(state: ChatState, data: dict):
+    direct = _direct_answer(state, data)
+    if direct:
+        return direct
+    data["cached_answer"] = cached_answer({**state, **data})
+    return data
 
 
-def budget_node(state: ChatState):
+def _itinerary_prompt(state: ChatState):
     destination = state.get("destination")
     days = state.get("days", 3)
+    return f"Create a {days}-day travel itinerary for {destination}. No pricing."
 
-    info = search(f"Average mid range travel cost per day in {destination}")
-
-    response = call_llm(
-        state,
-        f"Estimate total budget for {days} days in {destination}.\n{info}"
-    )
 
-    return {"budget_text": response.content}
+def _budget_query(state: ChatState):
+    return f"Average mid range travel cost per day in {state.get('destination')}"
 
 
-def risk_node(state: ChatState):
+def _budget_prompt(state: ChatState, info: str):
     destination = state.get("destination")
+    days = state.get("days", 3)
+    return f"Estimate total budget for {days} days in {destination}.\n{info}"
 
-    info = search(f"Current official travel advisory for {destination}")
 
-    result = call_llm(
-        state,
-        f"Analyze travel risks for {destination}.\n{info}",
-        RiskSchema,
-    )
+def _risk_query(state: ChatState):
+    return f"Current official travel advisory for {state.get('destination')}"
+
+
+def _risk_prompt(state: ChatState, info: str):
+    return f"Analyze travel risks for {state.get('destination')}.\n{info}"
+
 
+def _risk_result(result):
     data = result.model_dump()
 
     if not data["has_active_risk"]:
         return {"risk_text": "No major active travel advisories."}
 
-    risks = "\n".join(f"- {r}" for r in data.get("risk_details", []))
+    risks = "\n".join(f"- {r}" for r in data.get("risk_details") or [])
     return {"risk_text": f"Travel Advisory:\n{risks}"}
 
 
-def combine_node(state: ChatState):
-    if (
-        state.get("combined")
-        or not state.get("budget_text")
-        or not state.get("risk_text")
-    ):
-        return {}
-
-    final = f"""
-🗺 Itinerary
-{state.get("itinerary_text","").strip()}
-
-💰 Budget Estimate
-{state.get("budget_text","").strip()}
-
-⚠ Travel Advisory
-{state.get("risk_text","").strip()}
-"""
-
-    return {"messages": [AIMessage(content=final)], "combined": True}
-
-def executor_node(state: ChatState):
-    question = extract_text(state["messages"][-1])
-    intent = state.get("intent")
-
-    info = search(question)
-
-    if intent == "emergency":
-        prompt = f"""
+def _executor_prompt(state: ChatState, question: str, info: str):
+    if state.get("intent") == "emergency":
+        return f"""
         Provide ONLY official emergency contact numbers for {state.get("destination")}.
 
         Include:
@@ -214,8 +419,8 @@ def executor_node(state: ChatState):
         Use verified information:
         {info}
         """
-    else:
-        prompt = f"""
+
+    return f"""
         You are a professional travel assistant.
         Answer clearly and concisely.
 
@@ -226,9 +431,258 @@ def executor_node(state: ChatState):
         {info}
         """
 
-    response = call_llm(state, prompt)
 
-    return {"messages": [AIMessage(content=response.content)]}
+# =============================
+# NODES
+# =============================
+
+def local_classify(state: ChatState) -> Optional[QuerySchema]:
+    from main.fast_classifier import fast_classify
+
+    fields = fast_classify(extract_text(state["messages"][-1]))
+    return QuerySchema(**fields) if fields else None
+
+
+def cached_answer(state: ChatState) -> Optional[str]:
+    # numpy and the embedding model stay out of the import path
+    from main import semantic_cache
+
+    return semantic_cache.lookup(state, extract_text(state["messages"][-1]))
+
+
+def remember_answer(state: ChatState, answer: str):
+    from main import semantic_cache
+
+    semantic_cache.store(state, extract_text(state["messages"][-1]), answer)
+
+
+def _keep_prefetch(data: dict, prefetch_id):
+    # only the executor reads the prefetched search
+    if prefetch_id and route_query(data) not in EXECUTOR_ROUTES:
+        prefetch.discard(prefetch_id)
+        return None
+    return prefetch_id
+
+
+def classify_node(state: ChatState):
+    # SEARCH_PREFETCH=1: the executor's search runs while we classify
+    prefetch_id = prefetch.start(search, extract_text(state["messages"][-1]), node="classify")
+
+    result = local_classify(state)
+    if result is None:
+        result = call_llm(state, CLASSIFY_PROMPT, QuerySchema, node="classify")
+
+    data = _after_classify(state, _classify_result(result))
+    data["prefetch_id"] = _keep_prefetch(data, prefetch_id)
+    return data
+
+
+async def aclassify_node(state: ChatState):
+    prefetch_id = prefetch.astart(asearch, extract_text(state["messages"][-1]), node="classify")
+
+    # the local model is CPU-bound, keep it off the event loop
+    result = await asyncio.to_thread(local_classify, state)
+    if result is None:
+        result = await acall_llm(state, CLASSIFY_PROMPT, QuerySchema, node="classify")
+
+    data = await asyncio.to_thread(_after_classify, state, _classify_result(result))
+    data["prefetch_id"] = _keep_prefetch(data, prefetch_id)
+    return data
+
+
+def classify_batch(states, max_concurrency=None):
+    """classify_node for many questions at once (main.batch).
+
+    Questions the local classifier can't answer share one batched LLM
+    call. Returns the classify update, or the exception, for each state;
+    no search is prefetched.
+    """
+    results = [None] * len(states)
+    pending = []
+    for i, state in enumerate(states):
+        local = local_classify(state)
+        if local is None:
+            pending.append(i)
+        else:
+            results[i] = _classify_result(local)
+
+    if pending:
+        load_env()
+        outputs = models.runnable_for("classify", QuerySchema).batch(
+            [context.build_messages(states[i]["messages"], CLASSIFY_PROMPT, "classify") for i in pending],
+            {"max_concurrency": max_concurrency, "tags": [TAG_NOSTREAM]},
+            return_exceptions=True,
+        )
+        for i, output in zip(pending, outputs):
+            results[i] = output if isinstance(output, Exception) else _classify_result(output)
+
+    return [
+        data if isinstance(data, Exception) else _after_classify(state, data)
+        for state, data in zip(states, results)
+    ]
+
+
+ITINERARY_BRANCHES = ["itinerary", "budget", "risk"]
+EXECUTOR_ROUTES = ["visa", "hotel", "comparison", "emergency", "attraction", "general"]
+
+
+def route_query(state: ChatState):
+    if state.get("direct_answer"):
+        return "direct_answer"
+    if state.get("cached_answer"):
+        return "cached_answer"
+    if not state.get("is_travel_related"):
+        return "non_travel"
+    # budget and risk don't read itinerary_text, so all three run at once
+    if state.get("intent") == "itinerary":
+        return ITINERARY_BRANCHES
+    return state.get("intent")
+
+
+def stored_itinerary(state: ChatState) -> Optional[str]:
+    # precomputed by `python -m main.itinerary_store`
+    from main import itinerary_store
+
+    return itinerary_store.lookup(state)
+
+
+def itinerary_node(state: ChatState):
+    text = stored_itinerary(state)
+    if text is None:
+        text = call_llm(state, _itinerary_prompt(state), stream=True, node="itinerary").content
+    emit_section("itinerary", text)
+    return {"itinerary_text": text}
+
+
+async def aitinerary_node(state: ChatState):
+    text = await asyncio.to_thread(stored_itinerary, state)
+    if text is None:
+        response = await acall_llm(state, _itinerary_prompt(state), stream=True, node="itinerary")
+        text = response.content
+    emit_section("itinerary", text)
+    return {"itinerary_text": text}
+
+
+def budget_node(state: ChatState):
+    info = search(_budget_query(state), "budget", extract_text(state["messages"][-1]))
+    response = call_llm(state, _budget_prompt(state, info), node="budget")
+    emit_section("budget", response.content)
+    return {"budget_text": response.content}
+
+
+async def abudget_node(state: ChatState):
+    info = await asearch(_budget_query(state), "budget", extract_text(state["messages"][-1]))
+    response = await acall_llm(state, _budget_prompt(state, info), node="budget")
+    emit_section("budget", response.content)
+    return {"budget_text": response.content}
+
+
+def risk_node(state: ChatState):
+    info = search(_risk_query(state), "advisory", extract_text(state["messages"][-1]))
+    result = _risk_result(call_llm(state, _risk_prompt(state, info), RiskSchema, node="risk"))
+    emit_section("risk", result["risk_text"])
+    return result
+
+
+async def arisk_node(state: ChatState):
+    info = await asearch(_risk_query(state), "advisory", extract_text(state["messages"][-1]))
+    result = _risk_result(await acall_llm(state, _risk_prompt(state, info), RiskSchema, node="risk"))
+    emit_section("risk", result["risk_text"])
+    return result
+
+
+def combine_node(state: ChatState):
+    final = f"""
+🗺 Itinerary
+{state.get("itinerary_text","").strip()}
+
+💰 Budget Estimate
+{state.get("budget_text","").strip()}
+
+⚠ Travel Advisory
+{state.get("risk_text","").strip()}
+"""
+
+    remember_answer(state, final)
+    # the sections live on in the final message; keep checkpoints small
+    return {
+        "messages": [AIMessage(content=final)],
+        "itinerary_text": None,
+        "budget_text": None,
+        "risk_text": None,
+    }
+
+
+def _emergency_numbers(state: ChatState, question: str):
+    # numbers barely change, answer from the bundled table when we know the place
+    if state.get("intent") != "emergency":
+        return None
+
+    answer = emergency_answer(state.get("destination"), question)
+    if not answer:
+        return None
+
+    return {"messages": [AIMessage(content=answer)], **_source("emergency_table", None)}
+
+
+def executor_node(state: ChatState):
+    question = extract_text(state["messages"][-1])
+    prefetch_id = state.get("prefetch_id")
+
+    numbers = _emergency_numbers(state, question)
+    if numbers:
+        prefetch.discard(prefetch_id)
+        return numbers
+
+    info, score = knowledge_context(state, question)
+    source = _source("knowledge_base" if info else "web_search", score)
+    if info:
+        prefetch.discard(prefetch_id)
+    else:
+        info = prefetch.take(prefetch_id)
+        if info is None:
+            info = search(question)
+
+    response = call_llm(state, _executor_prompt(state, question, info), stream=True, node="executor")
+    remember_answer(state, response.content)
+    return {"messages": [AIMessage(content=response.content)], **source}
+
+
+async def aexecutor_node(state: ChatState):
+    question = extract_text(state["messages"][-1])
+    prefetch_id = state.get("prefetch_id")
+
+    numbers = _emergency_numbers(state, question)
+    if numbers:
+        prefetch.discard(prefetch_id)
+        return numbers
+
+    info, score = await asyncio.to_thread(knowledge_context, state, question)
+    source = _source("knowledge_base" if info else "web_search", score)
+    if info:
+        prefetch.discard(prefetch_id)
+    else:
+        info = await prefetch.atake(prefetch_id)
+        if info is None:
+            info = await asearch(question)
+
+    response = await acall_llm(state, _executor_prompt(state, question, info), stream=True, node="executor")
+    await asyncio.to_thread(remember_answer, state, response.content)
+    return {"messages": [AIMessage(content=response.content)], **source}
+
+
+def direct_answer_node(state: ChatState):
+    return {
+        "messages": [AIMessage(content=state["direct_answer"])],
+        **_source("place_index", None),
+    }
+
+
+def cached_answer_node(state: ChatState):
+    return {
+        "messages": [AIMessage(content=state["cached_answer"])],
+        **_source("semantic_cache", None),
+    }
 
 
 def non_travel_node(state: ChatState):
@@ -238,14 +692,26 @@ def non_travel_node(state: ChatState):
         ]
     }
 
+
+def _node(name, func, afunc=None):
+    # graph.invoke runs func, graph.ainvoke runs afunc on the event loop
+    return RunnableLambda(
+        instrumentation.instrument_node(name, func),
+        afunc=instrumentation.instrument_node(name, afunc),
+        name=func.__name__,
+    )
+
+
 uncompiled_graph = StateGraph(ChatState)
-uncompiled_graph.add_node("classify", classify_node)
-uncompiled_graph.add_node("itinerary", itinerary_node)
-uncompiled_graph.add_node("budget", budget_node)
-uncompiled_graph.add_node("risk", risk_node)
-uncompiled_graph.add_node("combine", combine_node)
-uncompiled_graph.add_node("executor", executor_node)
-uncompiled_graph.add_node("non_travel", non_travel_node)
+uncompiled_graph.add_node("classify", _node("classify", classify_node, aclassify_node))
+uncompiled_graph.add_node("itinerary", _node("itinerary", itinerary_node, aitinerary_node))
+uncompiled_graph.add_node("budget", _node("budget", budget_node, abudget_node))
+uncompiled_graph.add_node("risk", _node("risk", risk_node, arisk_node))
+uncompiled_graph.add_node("combine", _node("combine", combine_node))
+uncompiled_graph.add_node("executor", _node("executor", executor_node, aexecutor_node))
+uncompiled_graph.add_node("direct_answer", _node("direct_answer", direct_answer_node))
+uncompiled_graph.add_node("cached_answer", _node("cached_answer", cached_answer_node))
+uncompiled_graph.add_node("non_travel", _node("non_travel", non_travel_node))
 
 uncompiled_graph.set_entry_point("classify")
 
@@ -254,24 +720,47 @@ uncompiled_graph.add_conditional_edges(
     route_query,
     {
         "itinerary": "itinerary",
+        "budget": "budget",
+        "risk": "risk",
         "visa": "executor",
         "hotel": "executor",
         "comparison": "executor",
         "emergency": "executor",
         "attraction": "executor",
         "general": "executor",
+        "direct_answer": "direct_answer",
+        "cached_answer": "cached_answer",
         "non_travel": "non_travel",
     },
 )
 
-uncompiled_graph.add_edge("itinerary", "budget")
-uncompiled_graph.add_edge("itinerary", "risk")
-
-uncompiled_graph.add_edge("budget", "combine")
-uncompiled_graph.add_edge("risk", "combine")
+# combine waits for all three branches before running once
+uncompiled_graph.add_edge(ITINERARY_BRANCHES, "combine")
 
 uncompiled_graph.add_edge("combine", END)
 uncompiled_graph.add_edge("executor", END)
+uncompiled_graph.add_edge("direct_answer", END)
+uncompiled_graph.add_edge("cached_answer", END)
 uncompiled_graph.add_edge("non_travel", END)
 
-graph = uncompiled_graph.compile()
\ No newline at end of file
+# no checkpointer: one-off questions, and the LangGraph server (langgraph.json)
+# brings its own persistence
+graph = uncompiled_graph.compile()
+
+_checkpointed_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_graph():
+    """graph with a checkpointer (CHECKPOINTER=sqlite|memory|none), built on first use.
+
+    Callers pass configurable.thread_id to keep context across turns.
+    """
+    global _checkpointed_graph
+    if _checkpointed_graph is None:
+        with _graph_lock:
+            if _checkpointed_graph is None:
+                from main.checkpoint import make_checkpointer
+
+                _checkpointed_graph = uncompiled_graph.compile(checkpointer=make_checkpointer())
+    return _checkpointed_graph
\ No newline at end of file
@@ -0,0 +1,290 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from main import agent
+from main.search_cache import normalize_query
+
+# =============================
+# BATCH MODE
+# =============================
+# For nightly jobs (FAQ lists, destination pages). Reads JSONL questions and
+# writes one JSONL answer per line as each finishes:
+#
+#   python -m main.batch questions.jsonl answers.jsonl --concurrency 8
+#
+# - classification runs per chunk, as one batched LLM call
+# - identical itinerary work (intent, destination, days) and identical
+#   questions are answered once per run
+# - identical Tavily queries are sent once per run
+# - a rerun with the same output file skips ids already answered
+
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "32"))
+CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+QUESTION_FIELDS = ("question", "query", "text")
+# backlog-style records (requests.jsonl): the title and body together
+TITLE_FIELDS = ("title", "body")
+
+
+# =============================
+# SHARED SEARCH
+# =============================
+
+class SharedSearch:
+    """Tavily client wrapper: each distinct query is sent once per batch.
+
+    Concurrent callers of the same query wait for the first one's result.
+    Failures aren't kept, so a later caller tries again.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.requests = 0
+        self.calls = 0
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def search(self, query, **params):
+        key = (query, tuple(sorted(params.items())))
+        with self._lock:
+            self.requests += 1
+            future = self._results.get(key)
+            owner = future is None
+            if owner:
+                future = self._results[key] = Future()
+                self.calls += 1
+
+        if owner:
+            try:
+                future.set_result(self.client.search(query=query, **params))
+            except Exception as exc:
+                with self._lock:
+                    del self._results[key]
+                future.set_exception(exc)
+        return future.result()
+
+
+# =============================
+# INPUT / OUTPUT
+# =============================
+
+def _question(record, fields=None):
+    if fields:
+        return "\n\n".join(str(record[k]) for k in fields if record.get(k)) or None
+    question = next((record[k] for k in QUESTION_FIELDS if record.get(k)), None)
+    if question is None:
+        question = "\n\n".join(str(record[k]) for k in TITLE_FIELDS if record.get(k)) or None
+    return question
+
+
+def read_questions(path, fields=None):
+    """(id, question) per input line; the line number is the default id.
+
+    fields: read (and join) these fields instead of the defaults.
+    """
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            # 0 and "" are valid ids
+            if "id" in record:
+                item_id = record["id"]
+            elif "request_id" in record:
+                item_id = record["request_id"]
+            else:
+                item_id = number
+            yield str(item_id), _question(record, fields)
+
+
+def answered_ids(path):
+    """Ids already answered without error, for resuming."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # last line cut off by a crash
+                continue
+            if not record.get("error"):
+                done.add(record["id"])
+    return done
+
+
+def _ends_with_newline(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return True
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# =============================
+# RUNNER
+# =============================
+
+def work_key(data, question):
+    """Questions with the same key get the same answer."""
+    if data.get("intent") == "itinerary" and data.get("is_travel_related"):
+        # the itinerary, budget and risk prompts only read these slots
+        return ("itinerary", normalize_query(data.get("destination") or ""), data.get("days"))
+    return (data.get("intent"), normalize_query(question))
+
+
+class BatchRunner:
+    def __init__(self, out, concurrency=CONCURRENCY, batch_size=BATCH_SIZE):
+        self.out = out
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        # the graph resumes right after classify, from the batched result
+        self.graph = agent.uncompiled_graph.compile(checkpointer=InMemorySaver())
+        self.pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch")
+        self.work = {}
+        self.search = None
+        self.stats = {"answered": 0, "errors": 0, "deduplicated": 0, "skipped": 0}
+        self._lock = threading.Lock()
+
+    def _answer(self, question, data):
+        thread_id = uuid.uuid4().hex
+        config = {"configurable": {"thread_id": thread_id}}
+        state = {"messages": [HumanMessage(content=question)], **data}
+        started = time.perf_counter()
+        try:
+            self.graph.update_state(config, state, as_node="classify")
+            output = self.graph.invoke(None, config)
+        finally:
+            self.graph.checkpointer.delete_thread(thread_id)
+
+        return {
+            "answer": output["messages"][-1].content,
+            "intent": output.get("intent") if output.get("is_travel_related") else "non_travel",
+            "destination": output.get("destination"),
+            "days": output.get("days"),
+            "answer_source": output.get("answer_source"),
+            "latency_s": round(time.perf_counter() - started, 3),
+        }
+
+    def _write(self, record):
+        with self._lock:
+            self.stats["errors" if record.get("error") else "answered"] += 1
+            self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.out.flush()
+
+    def _finish(self, item_id, question, future, deduplicated):
+        record = {"id": item_id, "question": question}
+        if future.exception() is not None:
+            record["error"] = f"{type(future.exception()).__name__}: {future.exception()}"
+        else:
+            record.update(future.result(), deduplicated=deduplicated)
+        self._write(record)
+
+    def _submit(self, chunk, classified):
+        futures = []
+        for (item_id, question), data in zip(chunk, classified):
+            if isinstance(data, Exception):
+                self._write({"id": item_id, "question": question, "error": f"{type(data).__name__}: {data}"})
+                continue
+
+            key = work_key(data, question)
+            future = self.work.get(key)
+            deduplicated = future is not None
+            if deduplicated:
+                self.stats["deduplicated"] += 1
+            else:
+                future = self.work[key] = self.pool.submit(self._answer, question, data)
+
+            future.add_done_callback(
+                lambda f, i=item_id, q=question, d=deduplicated: self._finish(i, q, f, d)
+            )
+            futures.append(future)
+        return futures
+
+    def run(self, items, skip=()):
+        previous = agent.get_tavily()
+        self.search = SharedSearch(previous)
+        agent.use_clients(tavily=self.search)
+
+        try:
+            running = []
+            for chunk in _chunks(self._pending(items, skip), self.batch_size):
+                states = [{"messages": [HumanMessage(content=q)]} for _, q in chunk]
+                # classifying this chunk overlaps with the previous one running
+                classified = agent.classify_batch(states, max_concurrency=self.concurrency)
+                wait(running)
+                running = self._submit(chunk, classified)
+            wait(running)
+        finally:
+            agent.use_clients(tavily=previous)
+            self.pool.shutdown(wait=True)
+
+        return {**self.stats, "searches": self.search.requests, "search_calls": self.search.calls}
+
+    def _pending(self, items, skip):
+        for item_id, question in items:
+            if item_id in skip:
+                self.stats["skipped"] += 1
+            elif not question:
+                self._write({"id": item_id, "question": question, "error": "No question"})
+            else:
+                yield item_id, question
+
+
+def run_batch(input_path, output_path, concurrency=CONCURRENCY, batch_size=BATCH_SIZE, fields=None):
+    skip = answered_ids(output_path)
+    cut_off = not _ends_with_newline(output_path)
+    with open(output_path, "a", encoding="utf-8") as out:
+        if cut_off:
+            # don't append to a line a crash cut off
+            out.write("\n")
+        runner = BatchRunner(out, concurrency=concurrency, batch_size=batch_size)
+        return runner.run(read_questions(input_path, fields), skip=skip)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions")
+    parser.add_argument(
+        "input",
+        help="JSONL with a question (or query/text, or title + body) and optional id per line",
+    )
+    parser.add_argument("output", help="JSONL answers; appended to, so a rerun resumes")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument(
+        "--field",
+        action="append",
+        dest="fields",
+        help="read the question from this field (repeat to join several)",
+    )
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    stats = run_batch(args.input, args.output, args.concurrency, args.batch_size, args.fields)
+    print(f"✅ Batch done in {time.perf_counter() - started:.1f}s: {stats}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
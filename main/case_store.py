@@ -0,0 +1,477 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from difflib import SequenceMatcher
+
+from main.emergency_logger import JOURNAL_FILE
+
+# =============================
+# CONFIG
+# =============================
+# Emergency cases in SQLite instead of one flat JSON array: indexed by
+# status, location, nationality and date, paged with keyset cursors, and
+# checked for duplicate reports before a case is filed.
+#
+#   python -m main.case_store import                 # legacy JSON + journal
+#   python -m main.case_store list --status open --location jaipur
+#   python -m main.case_store set 42 resolved
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_PATH = os.getenv("CASE_STORE_PATH", os.path.join(BASE_DIR, "cases.sqlite3"))
+LEGACY_FILE = os.path.join(BASE_DIR, "main", "emergency_cases.json")
+
+# a report this similar to a case filed in the window is a duplicate
+DEDUPE_WINDOW_DAYS = int(os.getenv("CASE_DEDUPE_WINDOW_DAYS", "7"))
+NAME_SIMILARITY = 0.85
+DETAIL_SIMILARITY = 0.6
+# most candidates compared per report, newest first
+DEDUPE_CANDIDATES = 200
+
+PAGE_SIZE = 50
+IMPORT_BATCH = 1000
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+STATUSES = ("open", "in_progress", "resolved", "closed", "duplicate")
+TRANSITIONS = {
+    "open": {"in_progress", "resolved", "closed", "duplicate"},
+    "in_progress": {"open", "resolved", "closed"},
+    # a resolved case can be reopened until it is closed
+    "resolved": {"open", "closed"},
+    "closed": set(),
+    "duplicate": set(),
+}
+
+# legacy / journal field -> column
+FIELD_ALIASES = {
+    "name": ("name", "Complaint_By", "complaint_by"),
+    "nationality": ("nationality", "Nationality"),
+    "location": ("location", "Location", "incident_location"),
+    "item": ("item", "Lost_Item", "lost_item"),
+    "message": ("message", "original_message"),
+    "user_id": ("user_id",),
+    "created_at": ("created_at", "date", "timestamp"),
+    "status": ("status", "Status"),
+}
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+# =============================
+# NORMALISATION
+# =============================
+
+def _clean(value):
+    if value is None:
+        return None
+    value = " ".join(str(value).split())
+    return value or None
+
+
+def _key(value):
+    # indexed columns are compared lowercased, punctuation folded
+    value = _clean(value)
+    return " ".join(re.sub(r"[^\w\s]", " ", value.lower()).split()) if value else None
+
+
+# accepted created_at formats; slashes are read day first (20/02/2026)
+TIME_INPUT_FORMATS = (
+    TIME_FORMAT,
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%Y/%m/%d %H:%M:%S",
+    "%Y/%m/%d %H:%M",
+    "%Y/%m/%d",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+    "%d-%m-%Y %H:%M:%S",
+    "%d-%m-%Y %H:%M",
+    "%d-%m-%Y",
+)
+
+
+def _parse_time(value):
+    """datetime for a known date format, else None."""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    text = str(value).strip()
+    try:
+        # ISO 8601 with T, fractions or an offset
+        parsed = datetime.fromisoformat(text)
+        return parsed.astimezone().replace(tzinfo=None) if parsed.tzinfo else parsed
+    except ValueError:
+        pass
+    for fmt in TIME_INPUT_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _time(value):
+    # created_at is always TIME_FORMAT: the indexes and cursors order by it
+    # as text, and dedupe parses it. An unreadable date becomes "now".
+    parsed = _parse_time(value) if value not in (None, "") else None
+    return (parsed or datetime.now()).strftime(TIME_FORMAT)
+
+
+def _filter_time(value):
+    parsed = _parse_time(value)
+    if parsed is None:
+        raise ValueError(f"Unrecognised date: {value!r}")
+    return parsed.strftime(TIME_FORMAT)
+
+
+def normalize_case(record: dict) -> dict:
+    """One column set for legacy (Complaint_By, Lost_Item...) and journal records."""
+    case = {}
+    for column, aliases in FIELD_ALIASES.items():
+        case[column] = next((record[a] for a in aliases if record.get(a) not in (None, "")), None)
+
+    status = _key(case["status"]) or "open"
+    return {
+        "name": _clean(case["name"]),
+        "nationality": _key(case["nationality"]),
+        "location": _key(case["location"]),
+        "item": _clean(case["item"]),
+        "message": _clean(case["message"]),
+        "user_id": _clean(case["user_id"]),
+        "created_at": _time(case["created_at"]),
+        "status": status.replace(" ", "_") if status.replace(" ", "_") in STATUSES else "open",
+    }
+
+
+def blocking_key(case):
+    # only reports from the same place by a similarly named person are compared
+    name = _key(case.get("name")) or ""
+    return f"{case.get('location') or ''}|{name[:1]}"
+
+
+def _similar(a, b):
+    # a missing name or detail never matches: two anonymous reports from
+    # one place are not the same case
+    a, b = _key(a) or "", _key(b) or ""
+    if not a or not b:
+        return 0.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def is_duplicate(case, other):
+    if _similar(case["name"], other["name"]) < NAME_SIMILARITY:
+        return False
+    detail = _key(" ".join(filter(None, [case["item"], case["message"]]))) or ""
+    other_detail = _key(" ".join(filter(None, [other["item"], other["message"]]))) or ""
+
+    # "bag" (legacy Lost_Item) vs "lost my bag near hawa mahal" (message)
+    words, other_words = set(detail.split()), set(other_detail.split())
+    if words and other_words and (words <= other_words or other_words <= words):
+        return True
+    return _similar(detail, other_detail) >= DETAIL_SIMILARITY
+
+
+# =============================
+# STORE
+# =============================
+
+COLUMNS = ("name", "nationality", "location", "item", "message", "user_id", "created_at", "status")
+
+
+class CaseStore:
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        self._conn = None
+        self._lock = threading.RLock()
+
+    def _db(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                PRAGMA synchronous=NORMAL;
+                CREATE TABLE IF NOT EXISTS cases (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT,
+                    nationality TEXT,
+                    location TEXT,
+                    item TEXT,
+                    message TEXT,
+                    user_id TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT,
+                    status TEXT NOT NULL DEFAULT 'open',
+                    dedupe_key TEXT,
+                    duplicate_of INTEGER REFERENCES cases(id),
+                    source TEXT,
+                    source_id TEXT,
+                    UNIQUE (source, source_id)
+                );
+                CREATE INDEX IF NOT EXISTS cases_status ON cases (status, created_at, id);
+                CREATE INDEX IF NOT EXISTS cases_location ON cases (location, status, created_at, id);
+                CREATE INDEX IF NOT EXISTS cases_nationality ON cases (nationality, status, created_at, id);
+                CREATE INDEX IF NOT EXISTS cases_created ON cases (created_at, id);
+                CREATE INDEX IF NOT EXISTS cases_dedupe ON cases (dedupe_key, created_at);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                """
+            )
+            self._repair_times(conn)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _repair_times(conn):
+        # earlier versions stored unreadable dates as given
+        rows = conn.execute(
+            "SELECT id, created_at FROM cases WHERE created_at NOT GLOB "
+            "'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9]'"
+        ).fetchall()
+        if rows:
+            conn.executemany(
+                "UPDATE cases SET created_at = ? WHERE id = ?",
+                [(_time(row["created_at"]), row["id"]) for row in rows],
+            )
+            conn.commit()
+
+    # =============================
+    # WRITES
+    # =============================
+
+    def find_duplicate(self, case):
+        since = (
+            datetime.strptime(case["created_at"], TIME_FORMAT) - timedelta(days=DEDUPE_WINDOW_DAYS)
+        ).strftime(TIME_FORMAT)
+        rows = self._db().execute(
+            "SELECT * FROM cases WHERE dedupe_key = ? AND created_at BETWEEN ? AND ? "
+            "AND status NOT IN ('duplicate', 'closed') ORDER BY created_at DESC LIMIT ?",
+            (blocking_key(case), since, case["created_at"], DEDUPE_CANDIDATES),
+        ).fetchall()
+        for row in rows:
+            if is_duplicate(case, row):
+                return row["id"]
+        return None
+
+    def _insert(self, case, source=None, source_id=None, dedupe=True):
+        """Row id, or None if this source record was imported before."""
+        duplicate_of = self.find_duplicate(case) if dedupe else None
+        status = "duplicate" if duplicate_of else case["status"]
+        cur = self._db().execute(
+            f"INSERT OR IGNORE INTO cases ({', '.join(COLUMNS)}, dedupe_key, duplicate_of, source, source_id) "
+            f"VALUES ({', '.join('?' * (len(COLUMNS) + 4))})",
+            (*(case[c] for c in COLUMNS[:-1]), status, blocking_key(case), duplicate_of, source, source_id),
+        )
+        return cur.lastrowid if cur.rowcount else None
+
+    def add(self, record: dict, dedupe=True):
+        """File a case; a repeated report is kept with status 'duplicate'."""
+        case = normalize_case(record)
+        with self._lock:
+            case_id = self._insert(case, dedupe=dedupe)
+            self._db().commit()
+        return self.get(case_id)
+
+    def transition(self, case_id, status):
+        if status not in STATUSES:
+            raise InvalidTransition(f"Unknown status: {status}")
+        with self._lock:
+            db = self._db()
+            row = db.execute("SELECT status FROM cases WHERE id = ?", (case_id,)).fetchone()
+            if row is None:
+                raise KeyError(case_id)
+            if status not in TRANSITIONS[row["status"]]:
+                raise InvalidTransition(f"Case {case_id}: {row['status']} -> {status} not allowed")
+            db.execute(
+                "UPDATE cases SET status = ?, updated_at = ? WHERE id = ?",
+                (status, datetime.now().strftime(TIME_FORMAT), case_id),
+            )
+            db.commit()
+        return self.get(case_id)
+
+    # =============================
+    # READS
+    # =============================
+
+    def get(self, case_id):
+        if case_id is None:
+            return None
+        with self._lock:
+            row = self._db().execute("SELECT * FROM cases WHERE id = ?", (case_id,)).fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def _filters(status, location, nationality, since, until):
+        where, params = [], []
+        for column, value in (("status", status), ("location", _key(location)), ("nationality", _key(nationality))):
+            if value:
+                where.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            where.append("created_at >= ?")
+            params.append(_filter_time(since))
+        if until:
+            where.append("created_at < ?")
+            params.append(_filter_time(until))
+        return where, params
+
+    def query(self, status=None, location=None, nationality=None, since=None, until=None,
+              limit=PAGE_SIZE, cursor=None):
+        """(cases, next_cursor), newest first. Pass next_cursor back for the next page.
+
+        Keyset pagination on (created_at, id): every page costs the same,
+        however deep, and rows filed meanwhile don't shift the pages.
+        """
+        where, params = self._filters(status, location, nationality, since, until)
+        if cursor:
+            created_at, case_id = cursor.rsplit("|", 1)
+            where.append("(created_at, id) < (?, ?)")
+            params += [created_at, int(case_id)]
+
+        sql = "SELECT * FROM cases"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+
+        with self._lock:
+            rows = [dict(r) for r in self._db().execute(sql, (*params, limit + 1))]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = f"{rows[-1]['created_at']}|{rows[-1]['id']}"
+        return rows, next_cursor
+
+    def count(self, status=None, location=None, nationality=None, since=None, until=None):
+        where, params = self._filters(status, location, nationality, since, until)
+        sql = "SELECT COUNT(*) FROM cases" + (" WHERE " + " AND ".join(where) if where else "")
+        with self._lock:
+            return self._db().execute(sql, params).fetchone()[0]
+
+    # =============================
+    # IMPORT
+    # =============================
+
+    def import_records(self, records, source, dedupe=True):
+        """Insert (source_id, record) pairs; already imported ids are skipped."""
+        added = 0
+        with self._lock:
+            db = self._db()
+            for i, (source_id, record) in enumerate(records, 1):
+                if self._insert(normalize_case(record), source, str(source_id), dedupe) is not None:
+                    added += 1
+                if i % IMPORT_BATCH == 0:
+                    db.commit()
+            db.commit()
+        return added
+
+    def import_legacy(self, path=LEGACY_FILE):
+        if not os.path.exists(path):
+            return 0
+        with open(path, encoding="utf-8") as f:
+            records = json.load(f)
+        records.sort(key=lambda r: _time(r.get("date") or r.get("timestamp")))
+        return self.import_records(
+            ((r.get("id") or hashlib.sha1(json.dumps(r, sort_keys=True).encode()).hexdigest(), r)
+             for r in records),
+            source="legacy",
+        )
+
+    def sync_journal(self, path=JOURNAL_FILE):
+        """Import journal lines appended since the last sync."""
+        if not os.path.exists(path):
+            return 0
+        with self._lock:
+            row = self._db().execute("SELECT value FROM meta WHERE key = 'journal_offset'").fetchone()
+        offset = int(row["value"]) if row else 0
+        if offset > os.path.getsize(path):
+            # journal was replaced; source ids keep the rescan idempotent
+            offset = 0
+
+        def records():
+            nonlocal offset
+            with open(path, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # still being written
+                        break
+                    line_offset, offset = offset, offset + len(line)
+                    try:
+                        yield f"{line_offset}:{hashlib.sha1(line).hexdigest()[:12]}", json.loads(line)
+                    except ValueError:
+                        continue
+
+        added = self.import_records(records(), source="journal")
+        with self._lock:
+            db = self._db()
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('journal_offset', ?)", (str(offset),))
+            db.commit()
+        return added
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CaseStore()
+    return _store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emergency case store")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("import", help="import emergency_cases.json and new journal entries")
+
+    listing = commands.add_parser("list", help="newest cases first")
+    listing.add_argument("--status")
+    listing.add_argument("--location")
+    listing.add_argument("--nationality")
+    listing.add_argument("--since")
+    listing.add_argument("--until")
+    listing.add_argument("--limit", type=int, default=PAGE_SIZE)
+    listing.add_argument("--cursor", help="next_cursor printed by the previous page")
+
+    setter = commands.add_parser("set", help="change a case's status")
+    setter.add_argument("case_id", type=int)
+    setter.add_argument("status", choices=STATUSES)
+
+    args = parser.parse_args()
+    store = get_store()
+
+    if args.command == "import":
+        legacy = store.import_legacy()
+        journal = store.sync_journal()
+        print(f"✅ Imported {legacy} legacy and {journal} journal cases into: {STORE_PATH}")
+    elif args.command == "list":
+        cases, cursor = store.query(
+            args.status, args.location, args.nationality, args.since, args.until,
+            limit=args.limit, cursor=args.cursor,
+        )
+        for case in cases:
+            print(json.dumps(case, ensure_ascii=False))
+        if cursor:
+            print(f"next_cursor: {cursor}")
+    elif args.command == "set":
+        try:
+            case = store.transition(args.case_id, args.status)
+        except (InvalidTransition, KeyError) as exc:
+            raise SystemExit(f"❌ {exc}")
+        print(f"✅ Case {case['id']} is now {case['status']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from main import instrumentation
+
+# =============================
+# CONFIG
+# =============================
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# sqlite (default) | memory | none
+BACKEND = os.getenv("CHECKPOINTER", "sqlite")
+CHECKPOINT_PATH = os.getenv(
+    "CHECKPOINT_PATH", os.path.join(BASE_DIR, "checkpoints.sqlite3")
+)
+
+# checkpoints kept per thread; only the newest is needed to resume
+KEEP_PER_THREAD = int(os.getenv("CHECKPOINT_KEEP", "2"))
+# threads idle for longer than this are deleted
+THREAD_TTL = int(os.getenv("CHECKPOINT_THREAD_TTL", str(7 * 24 * 60 * 60)))
+# beyond this many threads the least recently active are deleted
+MAX_THREADS = int(os.getenv("CHECKPOINT_MAX_THREADS", "50000"))
+COMPACT_INTERVAL = float(os.getenv("CHECKPOINT_COMPACT_INTERVAL", "30"))
+
+# blobs smaller than this aren't worth compressing
+COMPRESS_MIN_BYTES = 256
+SWEEP_BATCH = 500
+
+stats = {
+    "compactions": 0,
+    "checkpoints_deleted": 0,
+    "threads_expired": 0,
+    "threads_evicted": 0,
+}
+
+instrumentation.register_collector("checkpoint", lambda: stats)
+
+
+# =============================
+# SERIALIZATION
+# =============================
+
+class ZlibSerializer:
+    """JsonPlusSerializer (msgpack) with zlib on top for larger blobs.
+
+    ChatState is mostly message text, which compresses 3-5x.
+    """
+
+    PREFIX = "z+"
+
+    def __init__(self, inner=None, level=6):
+        self.inner = inner or JsonPlusSerializer()
+        self.level = level
+
+    def dumps_typed(self, obj):
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) >= COMPRESS_MIN_BYTES:
+            return self.PREFIX + type_, zlib.compress(data, self.level)
+        return type_, data
+
+    def loads_typed(self, data):
+        type_, blob = data
+        if type_.startswith(self.PREFIX):
+            return self.inner.loads_typed((type_[len(self.PREFIX):], zlib.decompress(blob)))
+        return self.inner.loads_typed((type_, blob))
+
+
+# =============================
+# SQLITE SAVER WITH COMPACTION
+# =============================
+# put() only records which threads changed. A background thread later
+# trims each changed thread to its newest KEEP_PER_THREAD checkpoints and
+# deletes idle or excess threads, one thread per transaction, so requests
+# never wait behind a long delete. Safe for this graph: ChatState has no
+# DeltaChannel, so every checkpoint carries full channel values and no
+# ancestor is needed to resume.
+
+
+class CompactingSqliteSaver(SqliteSaver):
+    def __init__(
+        self,
+        conn,
+        *,
+        keep=KEEP_PER_THREAD,
+        ttl=THREAD_TTL,
+        max_threads=MAX_THREADS,
+        interval=COMPACT_INTERVAL,
+        serde=None,
+    ):
+        super().__init__(conn, serde=serde or ZlibSerializer())
+        self.keep = max(1, keep)
+        self.ttl = ttl
+        self.max_threads = max_threads
+        self.interval = interval
+        # (thread_id, checkpoint_ns) -> last put time, drained by compact()
+        self._dirty = {}
+        self._dirty_lock = threading.Lock()
+        self._compactor = None
+
+    def setup(self):
+        if self.is_setup:
+            return
+
+        # only takes effect on a new database, before any table exists
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        super().setup()
+        self.conn.executescript(
+            """
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS thread_activity (
+                thread_id TEXT PRIMARY KEY,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS thread_activity_updated
+                ON thread_activity (updated_at);
+            """
+        )
+        # threads written before a crash, whose activity wasn't flushed yet
+        self.conn.execute(
+            "INSERT OR IGNORE INTO thread_activity (thread_id, updated_at) "
+            "SELECT DISTINCT thread_id, ? FROM checkpoints",
+            (time.time(),),
+        )
+        self.conn.commit()
+
+    # =============================
+    # WRITES
+    # =============================
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+
+        key = (str(config["configurable"]["thread_id"]), config["configurable"].get("checkpoint_ns", ""))
+        with self._dirty_lock:
+            self._dirty[key] = time.time()
+        self._start_compactor()
+        return saved
+
+    def delete_thread(self, thread_id):
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute("DELETE FROM thread_activity WHERE thread_id = ?", (str(thread_id),))
+        with self._dirty_lock:
+            for key in [k for k in self._dirty if k[0] == str(thread_id)]:
+                del self._dirty[key]
+
+    # =============================
+    # COMPACTION
+    # =============================
+
+    def _trim(self, thread_id, checkpoint_ns):
+        with self.cursor() as cur:
+            row = cur.execute(
+                "SELECT checkpoint_id FROM checkpoints "
+                "WHERE thread_id = ? AND checkpoint_ns = ? "
+                "ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+                (thread_id, checkpoint_ns, self.keep - 1),
+            ).fetchone()
+            if row is None:
+                return 0
+
+            cur.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                (thread_id, checkpoint_ns, row[0]),
+            )
+            deleted = cur.rowcount
+            cur.execute(
+                "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                (thread_id, checkpoint_ns, row[0]),
+            )
+            return deleted
+
+    def compact(self):
+        """Trim threads written since the last run and record their activity."""
+        with self._dirty_lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+
+        activity = {}
+        for (thread_id, _), updated_at in dirty.items():
+            activity[thread_id] = max(updated_at, activity.get(thread_id, 0))
+
+        with self.cursor() as cur:
+            cur.executemany(
+                "INSERT INTO thread_activity (thread_id, updated_at) VALUES (?, ?) "
+                "ON CONFLICT(thread_id) DO UPDATE SET updated_at = excluded.updated_at",
+                list(activity.items()),
+            )
+
+        deleted = 0
+        for thread_id, checkpoint_ns in dirty:
+            deleted += self._trim(thread_id, checkpoint_ns)
+
+        stats["compactions"] += 1
+        stats["checkpoints_deleted"] += deleted
+
+    def _delete_threads(self, thread_ids):
+        for thread_id in thread_ids:
+            super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.executemany(
+                "DELETE FROM thread_activity WHERE thread_id = ?",
+                [(t,) for t in thread_ids],
+            )
+
+    def sweep(self):
+        """Delete idle threads, then the least recently used beyond max_threads."""
+        cutoff = time.time() - self.ttl
+        while True:
+            with self.cursor(transaction=False) as cur:
+                expired = [r[0] for r in cur.execute(
+                    "SELECT thread_id FROM thread_activity WHERE updated_at < ? LIMIT ?",
+                    (cutoff, SWEEP_BATCH),
+                )]
+            if not expired:
+                break
+            self._delete_threads(expired)
+            stats["threads_expired"] += len(expired)
+
+        with self.cursor(transaction=False) as cur:
+            excess = cur.execute("SELECT COUNT(*) FROM thread_activity").fetchone()[0] - self.max_threads
+        while excess > 0:
+            with self.cursor(transaction=False) as cur:
+                oldest = [r[0] for r in cur.execute(
+                    "SELECT thread_id FROM thread_activity ORDER BY updated_at LIMIT ?",
+                    (min(excess, SWEEP_BATCH),),
+                )]
+            if not oldest:
+                break
+            self._delete_threads(oldest)
+            stats["threads_evicted"] += len(oldest)
+            excess -= len(oldest)
+
+        with self.cursor() as cur:
+            # hand freed pages back to the filesystem, keep the WAL short
+            cur.execute("PRAGMA incremental_vacuum(2000)").fetchall()
+            cur.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+
+    def _start_compactor(self):
+        if self._compactor is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.compact()
+                    self.sweep()
+                except sqlite3.Error:
+                    # e.g. database locked by another process; retry next round
+                    continue
+
+        with self._dirty_lock:
+            if self._compactor is None:
+                self._compactor = threading.Thread(target=run, name="checkpoint-compactor", daemon=True)
+                self._compactor.start()
+
+    # =============================
+    # ASYNC (graph.ainvoke)
+    # =============================
+    # SqliteSaver is sync-only; run its calls on a worker thread so the
+    # same saver serves graph.invoke and graph.ainvoke.
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+# =============================
+# FACTORY
+# =============================
+
+def make_checkpointer(backend=BACKEND, path=CHECKPOINT_PATH):
+    if backend == "none":
+        return None
+
+    if backend == "memory":
+        # unbounded, for development only
+        from langgraph.checkpoint.memory import InMemorySaver
+
+        return InMemorySaver()
+
+    if backend == "sqlite":
+        return CompactingSqliteSaver(sqlite3.connect(path, check_same_thread=False))
+
+    raise ValueError(f"Unknown CHECKPOINTER: {backend}")
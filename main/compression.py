@@ -0,0 +1,150 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+from main import instrumentation
+from main.context import count_text_tokens
+
+# =============================
+# CONFIG
+# =============================
+# Search results used to be joined and cut at 4000 characters, which often
+# dropped the useful part and kept page boilerplate. Instead the results are
+# split into sentences, ranked with BM25 against the question (plus a few
+# words for what the node needs), deduplicated, and the best sentences that
+# fit the token budget are kept in their original order.
+
+ENABLED = os.getenv("SEARCH_COMPRESSION", "1") == "1"
+
+# prompt tokens of search context per purpose
+BUDGETS = {
+    "budget": 400,
+    "advisory": 400,
+}
+DEFAULT_BUDGET = 700
+
+# what a node looks for, added to the question when scoring
+PURPOSE_TERMS = {
+    "budget": "cost price budget per day night hotel hostel food meal transport ticket fee inr rs usd cheap expensive average",
+    "advisory": "advisory warning alert level caution risk safety security avoid unrest crime protest flood storm closed restricted",
+}
+
+# word-set overlap above which two sentences count as the same
+DUPLICATE_THRESHOLD = 0.8
+MIN_SENTENCE_CHARS = 25
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+WORD_RE = re.compile(r"\w+")
+BOILERPLATE_RE = re.compile(
+    r"cookie|subscribe|sign up|newsletter|all rights reserved|privacy policy"
+    r"|click here|log in|advertisement|read more",
+    re.I,
+)
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or "
+    "the to what when where which who why will with you your".split()
+)
+
+stats = {"calls": 0, "sentences_in": 0, "sentences_kept": 0, "duplicates": 0, "chars_in": 0, "chars_out": 0}
+_stats_lock = threading.Lock()
+
+instrumentation.register_collector("compression", lambda: stats)
+
+
+def budget_for(purpose):
+    env = os.getenv(f"SEARCH_CONTEXT_TOKENS_{(purpose or '').upper()}") if purpose else None
+    if env:
+        return int(env)
+    if purpose in BUDGETS:
+        return BUDGETS[purpose]
+    return int(os.getenv("SEARCH_CONTEXT_TOKENS", str(DEFAULT_BUDGET)))
+
+
+# =============================
+# SENTENCES + SCORING
+# =============================
+
+def split_sentences(contents):
+    sentences = []
+    for text in contents:
+        for part in SENTENCE_RE.split(text or ""):
+            part = " ".join(part.split())
+            if len(part) >= MIN_SENTENCE_CHARS and not BOILERPLATE_RE.search(part):
+                sentences.append(part)
+    return sentences
+
+
+def terms(text):
+    return [w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS]
+
+
+def bm25_scores(query_terms, docs, k1=1.5, b=0.75):
+    """BM25 of each tokenised doc (here: a sentence) for the query terms."""
+    if not docs:
+        return []
+    avg_len = sum(len(d) for d in docs) / len(docs) or 1.0
+    df = Counter(t for d in docs for t in set(d))
+    query = set(query_terms)
+
+    scores = []
+    for doc in docs:
+        tf = Counter(doc)
+        score = 0.0
+        for term in query:
+            if term in tf:
+                idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+                norm = k1 * (1 - b + b * len(doc) / avg_len)
+                score += idf * tf[term] * (k1 + 1) / (tf[term] + norm)
+        scores.append(score)
+    return scores
+
+
+def _duplicate(words, kept):
+    for other in kept:
+        overlap = len(words & other) / (len(words | other) or 1)
+        if overlap >= DUPLICATE_THRESHOLD:
+            return True
+    return False
+
+
+# =============================
+# COMPRESS
+# =============================
+
+def compress(contents, question, purpose=None, budget=None):
+    """Search context for a prompt: best sentences within the token budget."""
+    budget = budget if budget is not None else budget_for(purpose)
+    sentences = split_sentences(contents)
+    if not sentences:
+        return "\n".join(contents)[:budget * 4]
+
+    docs = [terms(s) for s in sentences]
+    query = terms(question) + terms(PURPOSE_TERMS.get(purpose, ""))
+    scores = bm25_scores(query, docs)
+
+    kept, kept_words, used, duplicates = [], [], 0, 0
+    # best first; ties keep the search engine's order
+    for i in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+        words = set(docs[i])
+        if _duplicate(words, kept_words):
+            duplicates += 1
+            continue
+        tokens = count_text_tokens(sentences[i])
+        if used + tokens > budget:
+            continue
+        kept.append(i)
+        kept_words.append(words)
+        used += tokens
+
+    text = "\n".join(sentences[i] for i in sorted(kept))
+
+    with _stats_lock:
+        stats["calls"] += 1
+        stats["sentences_in"] += len(sentences)
+        stats["sentences_kept"] += len(kept)
+        stats["duplicates"] += duplicates
+        stats["chars_in"] += sum(len(c) for c in contents)
+        stats["chars_out"] += len(text)
+    return text
@@ -0,0 +1,224 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from langchain_core.messages import AIMessage, SystemMessage, convert_to_messages
+
+from main import instrumentation
+
+# =============================
+# CONFIG
+# =============================
+# Every node used to send the whole conversation. Now each node gets the
+# newest messages that fit its token budget. Older turns are replaced by a
+# short extractive summary, so no extra LLM call is needed.
+
+ENABLED = os.getenv("CONTEXT_WINDOW_ENABLED", "1") == "1"
+
+# history tokens per node (the node's own prompt is not counted)
+NODE_BUDGETS = {
+    "classify": 300,
+    "itinerary": 1500,
+    "budget": 600,
+    "risk": 600,
+    "executor": 2000,
+}
+DEFAULT_BUDGET = 1500
+# the classifier only needs the last few turns
+NODE_MAX_MESSAGES = {"classify": 4}
+
+SUMMARY_TOKENS = int(os.getenv("CONTEXT_SUMMARY_TOKENS", "200"))
+SUMMARY_LINE_CHARS = 160
+SUMMARY_CACHE_SIZE = 1024
+
+stats = {"calls": 0, "messages_dropped": 0, "tokens_dropped": 0, "summary_hits": 0}
+_stats_lock = threading.Lock()
+
+instrumentation.register_collector("context", lambda: stats)
+
+
+def budget_for(node):
+    env = os.getenv(f"CONTEXT_BUDGET_{(node or '').upper()}")
+    if env:
+        return int(env)
+    return NODE_BUDGETS.get(node, DEFAULT_BUDGET)
+
+
+# =============================
+# TOKEN COUNTING
+# =============================
+# A word/punctuation estimate (Llama's tokenizer averages ~1.3 tokens per
+# word). It's memoised by text, so a message is counted once no matter how
+# many nodes look at it.
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache(maxsize=8192)
+def count_text_tokens(text: str) -> int:
+    return (len(TOKEN_RE.findall(text)) * 4 + 2) // 3
+
+
+def count_tokens(message) -> int:
+    # +4 for the role/turn markers every chat message carries
+    return count_text_tokens(_text(message)) + 4
+
+
+def is_ai(message) -> bool:
+    # graphs without the checkpointed reducer keep role dicts as they came in
+    if isinstance(message, dict):
+        return message.get("role", message.get("type")) in ("ai", "assistant")
+    return isinstance(message, AIMessage)
+
+
+def has_answer(messages) -> bool:
+    """True once the conversation contains an assistant turn."""
+    return any(is_ai(m) for m in messages)
+
+
+def _text(message):
+    content = getattr(message, "content", message)
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return str(content)
+
+
+# =============================
+# ROLLING SUMMARY
+# =============================
+# Summaries are keyed by a hash chain over the dropped prefix. When the
+# window slides, the summary for the longer prefix extends the cached one
+# for the shorter prefix instead of being rebuilt.
+
+_summaries = OrderedDict()
+_summary_lock = threading.Lock()
+
+
+def _prefix_hashes(messages):
+    hashes = []
+    digest = b""
+    for message in messages:
+        digest = hashlib.sha1(
+            digest + message.type.encode() + b"\0" + _text(message).encode("utf-8")
+        ).digest()
+        hashes.append(digest)
+    return hashes
+
+
+def _summary_line(message):
+    text = " ".join(_text(message).split())
+    if not text:
+        return None
+    # first sentence is usually the gist of both questions and answers
+    first = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    if len(first) > SUMMARY_LINE_CHARS:
+        first = first[:SUMMARY_LINE_CHARS].rsplit(" ", 1)[0] + "…"
+    role = "User" if message.type == "human" else "Assistant"
+    return f"{role}: {first}"
+
+
+def _trim(lines):
+    # keep the most recent lines within SUMMARY_TOKENS
+    kept, used = [], 0
+    for line in reversed(lines):
+        tokens = count_text_tokens(line)
+        if used + tokens > SUMMARY_TOKENS:
+            break
+        kept.append(line)
+        used += tokens
+    return list(reversed(kept))
+
+
+def summarize(older):
+    """Summary lines for the messages that fell out of the window."""
+    if not older:
+        return []
+    hashes = _prefix_hashes(older)
+
+    with _summary_lock:
+        cached = _summaries.get(hashes[len(older) - 1])
+        if cached is not None:
+            _summaries.move_to_end(hashes[len(older) - 1])
+            with _stats_lock:
+                stats["summary_hits"] += 1
+            return cached
+
+        # longest summarised prefix we can extend
+        start, lines = 0, []
+        for i in range(len(older) - 2, -1, -1):
+            if hashes[i] in _summaries:
+                start, lines = i + 1, list(_summaries[hashes[i]])
+                break
+
+    for message in older[start:]:
+        if message.type in ("human", "ai"):
+            line = _summary_line(message)
+            if line:
+                lines.append(line)
+    lines = _trim(lines)
+
+    with _summary_lock:
+        _summaries[hashes[len(older) - 1]] = lines
+        while len(_summaries) > SUMMARY_CACHE_SIZE:
+            _summaries.popitem(last=False)
+    return lines
+
+
+# =============================
+# WINDOW
+# =============================
+
+def window(messages, node=None, budget=None):
+    """(older, recent): recent is the newest suffix within the node's budget.
+
+    The last message (the current question) is always kept.
+    """
+    if not messages:
+        return [], []
+
+    budget = budget if budget is not None else budget_for(node)
+    max_messages = NODE_MAX_MESSAGES.get(node)
+
+    used = 0
+    start = len(messages)
+    for i in range(len(messages) - 1, -1, -1):
+        tokens = count_tokens(messages[i])
+        if start < len(messages) and (
+            used + tokens > budget
+            or (max_messages and len(messages) - i > max_messages)
+        ):
+            break
+        used += tokens
+        start = i
+
+    return messages[:start], messages[start:]
+
+
+def build_messages(messages, prompt, node=None):
+    """History for one LLM call: summary of older turns, recent turns, prompt."""
+    # role dicts and (role, text) tuples become message objects
+    messages = convert_to_messages(messages)
+    if not ENABLED:
+        return messages + [SystemMessage(content=prompt)]
+
+    older, recent = window(messages, node)
+    context = []
+
+    lines = summarize(older)
+    if lines:
+        context.append(SystemMessage(
+            content="Summary of earlier conversation:\n" + "\n".join(lines)
+        ))
+
+    with _stats_lock:
+        stats["calls"] += 1
+        stats["messages_dropped"] += len(older)
+        stats["tokens_dropped"] += sum(count_tokens(m) for m in older)
+
+    return context + list(recent) + [SystemMessage(content=prompt)]
@@ -1,10 +1,187 @@
+import atexit
 import json
 import os
+import sys
+import threading
+import time
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
 # Always write file in project root
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Legacy JSON array, now produced by export_legacy_json()
 LOG_FILE = os.path.join(BASE_DIR, "emergency_logs.json")
+# Append-only journal, one JSON object per line
+JOURNAL_FILE = os.path.join(BASE_DIR, "emergency_logs.jsonl")
+
+# fsync after this many appends, or after this many seconds, whichever first
+FSYNC_EVERY = int(os.getenv("EMERGENCY_FSYNC_EVERY", "64"))
+FSYNC_INTERVAL = float(os.getenv("EMERGENCY_FSYNC_INTERVAL", "0.05"))
+
+
+def _flock(fd, exclusive=True):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+
+def _funlock(fd):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def _write_all(fd, data: bytes):
+    view = memoryview(data)
+    while view:
+        written = os.write(fd, view)
+        view = view[written:]
+
+
+def _read_journal(path):
+    entries = []
+    if not os.path.exists(path):
+        return entries
+
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # a torn final line from a crash mid-write
+                continue
+    return entries
+
+
+class EmergencyJournal:
+    def __init__(self, path=JOURNAL_FILE, legacy_path=LOG_FILE):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._fd = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._syncer = None
+
+    # =============================
+    # OPEN + MIGRATE
+    # =============================
+
+    def migrate(self):
+        with self._lock:
+            self._open()
+
+    def _open(self):
+        if self._fd is not None:
+            return self._fd
+
+        # read access only to check the last byte below
+        fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        _flock(fd)
+        try:
+            # a crash mid-write left a torn last line: end it, or the next
+            # entry would be glued onto it and dropped with it on read
+            size = os.fstat(fd).st_size
+            if size and os.pread(fd, 1, size - 1) != b"\n":
+                _write_all(fd, b"\n")
+                os.fsync(fd)
+
+            # first writer ever: carry over entries from the legacy JSON array
+            if os.fstat(fd).st_size == 0 and os.path.exists(self.legacy_path):
+                with open(self.legacy_path, "r") as f:
+                    legacy = json.load(f)
+                if legacy:
+                    _write_all(fd, b"".join(
+                        (json.dumps(e, ensure_ascii=False) + "\n").encode("utf-8")
+                        for e in legacy
+                    ))
+                    os.fsync(fd)
+        finally:
+            _funlock(fd)
+
+        self._fd = fd
+        return fd
+
+    # =============================
+    # APPEND
+    # =============================
+
+    def append(self, entry: dict):
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+
+        with self._lock:
+            fd = self._open()
+            # O_APPEND + an exclusive lock: writers in other processes can
+            # never interleave with or overwrite this line
+            _flock(fd)
+            try:
+                _write_all(fd, line)
+            finally:
+                _funlock(fd)
+
+            self._pending += 1
+            now = time.monotonic()
+            if self._pending >= FSYNC_EVERY or now - self._last_sync >= FSYNC_INTERVAL:
+                self._sync()
+            else:
+                self._start_syncer()
+
+    def _sync(self):
+        if self._fd is not None and self._pending:
+            os.fsync(self._fd)
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._sync()
+
+    def _start_syncer(self):
+        # background fsync so a quiet tail of appends is durable within FSYNC_INTERVAL
+        if self._syncer is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(FSYNC_INTERVAL)
+                with self._lock:
+                    if self._pending:
+                        self._sync()
+
+        self._syncer = threading.Thread(target=run, name="emergency-log-fsync", daemon=True)
+        self._syncer.start()
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    # =============================
+    # READ / EXPORT
+    # =============================
+
+    def read_all(self):
+        self.flush()
+        return _read_journal(self.path)
+
+    def export_legacy_json(self, path=None):
+        # compaction: fold the journal back into the legacy JSON array
+        path = path or self.legacy_path
+        entries = self.read_all()
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f, indent=4)
+        os.replace(tmp_path, path)
+        return len(entries)
+
+
+journal = EmergencyJournal()
+atexit.register(journal.close)
 
 
 def log_emergency_case(user_id, name, nationality, incident_location, original_message):
@@ -19,18 +196,26 @@ def log_emergency_case(user_id, name, nationality, incident_location, original_m
         "status": "OPEN"
     }
 
-    # Create file if it doesn't exist
-    if not os.path.exists(LOG_FILE):
-        with open(LOG_FILE, "w") as f:
-            json.dump([], f)
+    journal.append(new_entry)
+    return new_entry
+
+
+def read_emergency_cases():
+    return journal.read_all()
+
+
+def export_legacy_json(path=LOG_FILE):
+    return journal.export_legacy_json(path)
 
-    # Load existing data
-    with open(LOG_FILE, "r") as f:
-        data = json.load(f)
 
-    # Append new entry
-    data.append(new_entry)
+if __name__ == "__main__":
+    # python -m main.emergency_logger [migrate|export]
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
 
-    # Save back
-    with open(LOG_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    if command == "migrate":
+        journal.migrate()
+        print(f"✅ Journal ready at: {JOURNAL_FILE}")
+    elif command == "export":
+        print(f"✅ Exported {export_legacy_json()} entries to: {LOG_FILE}")
+    else:
+        sys.exit(f"Unknown command: {command}")
@@ -0,0 +1,139 @@
+import json
+import os
+import re
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NUMBERS_FILE = os.path.join(BASE_DIR, "emergency_numbers.json")
+
+# aliases this short ("us", "uk") only count as an exact destination match
+MIN_SCAN_LENGTH = 3
+
+# words a location may carry besides its names ("the city of jaipur")
+FILLER_WORDS = {"the", "city", "of", "and", "area", "region", "state", "old", "downtown"}
+
+# where a question names its location: "... in Paris, Texas?"
+LOCATION_RE = re.compile(
+    r"\b(?:in|at|near|from|visiting)\s+(.+?)"
+    r"(?=[?.!;:]|\s+(?:for|during|while|with|if|when|right now|today|tonight)\b"
+    r"|,\s*(?:who|what|where|how|which|can|should|is|do|does|i|we|my|please)\b|$)",
+    re.IGNORECASE,
+)
+
+SERVICES = [
+    ("police", "Police"),
+    ("ambulance", "Ambulance"),
+    ("fire", "Fire"),
+    ("general", "General emergency"),
+    ("tourist", "Tourist helpline"),
+]
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+class EmergencyNumbers:
+    def __init__(self, data):
+        self.version = data["version"]
+        self.countries = data["countries"]
+
+        # place name -> country code, for cities, states and country aliases
+        self.places = dict(data["cities"])
+        for code, country in self.countries.items():
+            for alias in country["aliases"]:
+                self.places[alias] = code
+
+        names = sorted(
+            (p for p in self.places if len(p) >= MIN_SCAN_LENGTH),
+            key=len,
+            reverse=True,
+        )
+        self.scan_re = re.compile(r"\b(" + "|".join(re.escape(n) for n in names) + r")\b")
+
+    def _location(self, text):
+        """(name, country_code) if every part of text is a known place of one
+        country, else None: "Paris, Texas" is not France."""
+        names, codes = [], set()
+        for part in text.split(","):
+            key = _normalize(part)
+            if not key:
+                continue
+            if key in self.places:
+                names.append(key)
+                codes.add(self.places[key])
+                continue
+            found = [m.group(1) for m in self.scan_re.finditer(key)]
+            leftover = set(self.scan_re.sub(" ", key).split()) - FILLER_WORDS
+            if not found or leftover:
+                return None
+            names += found
+            codes.update(self.places[n] for n in found)
+
+        if len(codes) != 1:
+            return None
+        return max(names, key=len), codes.pop()
+
+    def resolve(self, destination=None, question=None):
+        """Return (place, country_code) for the known location, else None.
+
+        Emergency numbers must not be guessed: the table only answers when
+        the destination (or every location the question names) is made up
+        of known places of a single country. Anything else ("Paris, Texas",
+        "Cambridge, Massachusetts") is left to search + LLM.
+        """
+        if destination:
+            key = _normalize(destination)
+            if key in self.places:
+                return destination, self.places[key]
+            resolved = self._location(destination)
+            return (resolved[0].title(), resolved[1]) if resolved else None
+
+        if not question:
+            return None
+        found = [self._location(m.group(1)) for m in LOCATION_RE.finditer(question)]
+        if not found or None in found:
+            return None
+        # other places named elsewhere in the question must agree too
+        codes = {code for _, code in found}
+        codes.update(self.places[m.group(1)] for m in self.scan_re.finditer(_normalize(question)))
+        if len(codes) != 1:
+            return None
+        name = max((name for name, _ in found), key=len)
+        return name.title(), codes.pop()
+
+    def answer(self, destination=None, question=None):
+        resolved = self.resolve(destination, question)
+        if not resolved:
+            return None
+
+        place, code = resolved
+        country = self.countries[code]
+        where = country["name"] if _normalize(place) in country["aliases"] else f"{place}, {country['name']}"
+
+        lines = [f"Emergency contact numbers for {where}:"]
+        lines += [
+            f"- {label}: {country[key]}"
+            for key, label in SERVICES
+            if country.get(key)
+        ]
+        lines.append(f"(Emergency numbers dataset v{self.version})")
+        return "\n".join(lines)
+
+
+_numbers = None
+
+
+def load_numbers():
+    global _numbers
+    if _numbers is None:
+        with open(NUMBERS_FILE, encoding="utf-8") as f:
+            data = json.load(f)
+
+        # only country and city names: landmark aliases from the place index
+        # ("botanical garden", "city palace") exist in other countries too
+        _numbers = EmergencyNumbers(data)
+    return _numbers
+
+
+def emergency_answer(destination=None, question=None):
+    return load_numbers().answer(destination, question)
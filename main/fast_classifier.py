@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+from main import instrumentation
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EXAMPLES_FILE = os.getenv(
+    "FAST_CLASSIFIER_EXAMPLES", os.path.join(BASE_DIR, "classifier_examples.json")
+)
+# held out: never used as training examples, only to pick the thresholds
+HELD_OUT_FILE = os.path.join(os.path.dirname(BASE_DIR), "evaluation", "dataset.json")
+
+ENABLED = os.getenv("FAST_CLASSIFIER_ENABLED", "1") == "1"
+# cosine similarity to the winning centroid, and lead over the runner-up;
+# re-derive with `python -m main.fast_classifier --calibrate`
+THRESHOLD = float(os.getenv("FAST_CLASSIFIER_THRESHOLD", "0.55"))
+MARGIN = float(os.getenv("FAST_CLASSIFIER_MARGIN", "0.05"))
+
+# evaluation/dataset.json style labels -> classifier labels
+TYPE_TO_LABEL = {
+    "reject": "non_travel",
+    "itinerary": "itinerary",
+    "comparison": "comparison",
+    "emergency": "emergency",
+}
+
+stats = {"fast_path": 0, "llm_fallback": 0, "by_label": {}}
+_stats_lock = threading.Lock()
+
+instrumentation.register_collector("fast_classifier", lambda: stats)
+
+# =============================
+# SLOT EXTRACTION
+# =============================
+
+DAYS_RE = re.compile(r"\b(\d{1,2})\s*-?\s*(?:day|days|night|nights)\b", re.I)
+BUDGET_RE = re.compile(r"\b(budget|cheap|luxury|mid[- ]range|backpack\w*)\b", re.I)
+DESTINATION_RE = re.compile(
+    r"\b(?:in|to|for|at|visit|visiting|around|of)\s+"
+    r"([A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)*)"
+)
+COMPARISON_RE = re.compile(
+    r"^(?i:compare\s+)?([A-Z][\w' -]*?)\s+(?:vs\.?|versus|or|and)\s+"
+    r"([A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)*)"
+)
+
+
+def extract_slots(question: str) -> dict:
+    slots = {}
+
+    days = DAYS_RE.search(question)
+    if days:
+        slots["days"] = int(days.group(1))
+
+    budget = BUDGET_RE.search(question)
+    if budget:
+        word = budget.group(1).lower()
+        slots["budget_type"] = (
+            "mid-range" if word.startswith("mid") else
+            "luxury" if word == "luxury" else
+            "budget"
+        )
+
+    destination = DESTINATION_RE.search(question)
+    if destination:
+        slots["destination"] = destination.group(1)
+
+    comparison = COMPARISON_RE.search(question.strip())
+    if comparison:
+        slots["place1"] = comparison.group(1).strip()
+        slots["place2"] = comparison.group(2).strip()
+
+    return slots
+
+
+# slots the downstream node can't work without
+REQUIRED_SLOTS = {
+    "itinerary": ("destination",),
+    "emergency": ("destination",),
+    "comparison": ("place1", "place2"),
+}
+
+# =============================
+# NEAREST-CENTROID MODEL
+# =============================
+
+
+def load_examples(path=EXAMPLES_FILE):
+    with open(path, encoding="utf-8") as f:
+        rows = json.load(f)
+
+    examples = []
+    for row in rows:
+        if "label" in row:
+            examples.append((row["text"], row["label"]))
+        elif row.get("type") in TYPE_TO_LABEL:
+            examples.append((row["input"], TYPE_TO_LABEL[row["type"]]))
+    return examples
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class CentroidClassifier:
+    def __init__(self, embed_documents, embed_query):
+        self.embed_documents = embed_documents
+        self.embed_query = embed_query
+        self.labels = []
+        self.centroids = None
+
+    def fit(self, examples):
+        texts = [text for text, _ in examples]
+        vectors = _normalize(np.asarray(self.embed_documents(texts), dtype=np.float32))
+
+        self.labels = sorted({label for _, label in examples})
+        self.centroids = _normalize(np.stack([
+            vectors[[i for i, (_, l) in enumerate(examples) if l == label]].mean(axis=0)
+            for label in self.labels
+        ]))
+        return self
+
+    def predict(self, text: str):
+        query = _normalize(np.asarray(self.embed_query(text), dtype=np.float32))
+        sims = self.centroids @ query
+        order = np.argsort(sims)[::-1]
+        best = float(sims[order[0]])
+        second = float(sims[order[1]]) if len(order) > 1 else -1.0
+        return self.labels[order[0]], best, best - second
+
+
+_model = None
+_model_failed = False
+_model_lock = threading.Lock()
+
+
+def get_model():
+    global _model, _model_failed
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                if _model_failed:
+                    raise RuntimeError("fast classifier unavailable")
+                _model_failed = True
+                import retriever
+
+                _model = CentroidClassifier(
+                    retriever.get_embeddings().embed_documents,
+                    retriever.embed_query,
+                ).fit(load_examples())
+                _model_failed = False
+    return _model
+
+
+def _count(key, label=None):
+    with _stats_lock:
+        stats[key] += 1
+        if label:
+            stats["by_label"][label] = stats["by_label"].get(label, 0) + 1
+
+
+def fast_classify(question: str):
+    """Return QuerySchema fields when the local model is confident, else None."""
+    if not ENABLED or not question.strip():
+        _count("llm_fallback")
+        return None
+
+    try:
+        label, score, margin = get_model().predict(question)
+    except Exception:
+        _count("llm_fallback")
+        return None
+
+    if score < THRESHOLD or margin < MARGIN:
+        _count("llm_fallback")
+        return None
+
+    if label == "non_travel":
+        _count("fast_path", label)
+        return {"is_travel_related": False, "intent": "general"}
+
+    slots = extract_slots(question)
+    if any(not slots.get(slot) for slot in REQUIRED_SLOTS.get(label, ())):
+        _count("llm_fallback")
+        return None
+
+    if label != "comparison":
+        slots.pop("place1", None)
+        slots.pop("place2", None)
+
+    _count("fast_path", label)
+    return {"is_travel_related": True, "intent": label, **slots}
+
+
+def fast_path_rate() -> float:
+    total = stats["fast_path"] + stats["llm_fallback"]
+    return stats["fast_path"] / total if total else 0.0
+
+
+# =============================
+# CALIBRATION
+# =============================
+# Picks THRESHOLD/MARGIN on held-out questions the classifier was not
+# fitted on: the widest fast path whose answers are still right at least
+# min_precision of the time.
+
+def calibrate(model, held_out, min_precision=0.95):
+    scored = []
+    for text, label in held_out:
+        predicted, score, margin = model.predict(text)
+        scored.append((predicted == label, score, margin))
+
+    best = None
+    for threshold in [t / 100 for t in range(30, 91, 5)]:
+        for margin in [m / 100 for m in range(0, 16)]:
+            taken = [ok for ok, s, m in scored if s >= threshold and m >= margin]
+            if not taken:
+                continue
+            precision = sum(taken) / len(taken)
+            coverage = len(taken) / len(scored)
+            # ties go to the stricter setting
+            key = (coverage, threshold, margin)
+            if precision >= min_precision and (best is None or key > best[0]):
+                best = (key, precision)
+
+    if best is None:
+        return None
+    (coverage, threshold, margin), precision = best
+    return {"threshold": threshold, "margin": margin, "precision": precision, "coverage": coverage}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast classifier tools")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="pick THRESHOLD and MARGIN on held-out questions")
+    parser.add_argument("--held-out", default=HELD_OUT_FILE,
+                        help="dataset.json-style file, disjoint from the examples")
+    parser.add_argument("--min-precision", type=float, default=0.95)
+    args = parser.parse_args()
+    if not args.calibrate:
+        parser.print_help()
+        return
+
+    examples = load_examples()
+    held_out = load_examples(args.held_out)
+    overlap = {t.lower() for t, _ in examples} & {t.lower() for t, _ in held_out}
+    if overlap:
+        raise SystemExit(f"❌ {len(overlap)} held-out questions are also training examples: {sorted(overlap)}")
+
+    result = calibrate(get_model(), held_out, args.min_precision)
+    if result is None:
+        print(f"❌ no setting reaches {args.min_precision:.0%} precision on {len(held_out)} questions")
+        return
+    print(
+        f"✅ FAST_CLASSIFIER_THRESHOLD={result['threshold']:.2f} FAST_CLASSIFIER_MARGIN={result['margin']:.2f} "
+        f"(precision {result['precision']:.0%}, fast path {result['coverage']:.0%} of {len(held_out)} held-out)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+import atexit
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =============================
+# CONFIG
+# =============================
+# Off by default: every hook below starts with a single flag check, so the
+# disabled cost is one global lookup per node / LLM call / search.
+
+ENABLED = os.getenv("METRICS_ENABLED", "0") == "1"
+# samples kept per histogram series for the percentiles
+RESERVOIR_SIZE = int(os.getenv("METRICS_RESERVOIR_SIZE", "2048"))
+# written on exit: Prometheus text, or JSON when the name ends in .json
+METRICS_FILE = os.getenv("METRICS_FILE")
+
+PREFIX = "tourism_agent_"
+QUANTILES = (0.5, 0.95, 0.99)
+
+# node currently running, so LLM and search samples are labelled with it
+_current_node = contextvars.ContextVar("current_node", default="none")
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+# =============================
+# REGISTRY
+# =============================
+
+class Histogram:
+    """Count and sum of every sample, percentiles over the most recent ones."""
+
+    def __init__(self, size=RESERVOIR_SIZE):
+        self.count = 0
+        self.sum = 0.0
+        self.samples = deque(maxlen=size)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def quantiles(self):
+        values = sorted(self.samples)
+        if not values:
+            return {q: 0.0 for q in QUANTILES}
+        return {q: values[min(len(values) - 1, int(q * len(values)))] for q in QUANTILES}
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.collectors = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def register_collector(self, name, func):
+        # func() -> dict of numbers (or dicts of numbers), read at export time
+        self.collectors[name] = func
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def _gauges(self):
+        gauges = []
+        for collector, func in self.collectors.items():
+            try:
+                values = func()
+            except Exception:
+                continue
+            for key, value in values.items():
+                if isinstance(value, dict):
+                    for label, v in value.items():
+                        gauges.append((f"{collector}_{key}", (("key", str(label)),), v))
+                elif isinstance(value, (int, float)):
+                    gauges.append((f"{collector}_{key}", (), value))
+        return gauges
+
+    # =============================
+    # EXPORT
+    # =============================
+
+    def snapshot(self):
+        with self._lock:
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": h.count,
+                    "sum": h.sum,
+                    **{f"p{int(q * 100)}": v for q, v in h.quantiles().items()},
+                }
+                for (name, labels), h in sorted(self.histograms.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+
+        gauges = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for name, labels, value in self._gauges()
+        ]
+        return {"histograms": histograms, "counters": counters, "gauges": gauges}
+
+    def prometheus_text(self):
+        lines = []
+        snapshot = self.snapshot()
+
+        def fmt(labels, extra=None):
+            items = list(labels.items()) + (extra or [])
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+        typed = set()
+
+        def header(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        for h in snapshot["histograms"]:
+            name = PREFIX + h["name"]
+            header(name, "summary")
+            for q in QUANTILES:
+                value = h[f"p{int(q * 100)}"]
+                lines.append(f"{name}{fmt(h['labels'], [('quantile', q)])} {value}")
+            lines.append(f"{name}_sum{fmt(h['labels'])} {h['sum']}")
+            lines.append(f"{name}_count{fmt(h['labels'])} {h['count']}")
+
+        for c in snapshot["counters"]:
+            name = PREFIX + c["name"]
+            header(name, "counter")
+            lines.append(f"{name}{fmt(c['labels'])} {c['value']}")
+
+        for g in snapshot["gauges"]:
+            name = PREFIX + g["name"]
+            header(name, "gauge")
+            lines.append(f"{name}{fmt(g['labels'])} {g['value']}")
+
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        if path.endswith(".json"):
+            body = json.dumps(self.snapshot(), indent=2)
+        else:
+            body = self.prometheus_text()
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+
+registry = Registry()
+
+
+def register_collector(name, func):
+    registry.register_collector(name, func)
+
+
+def prometheus_text():
+    return registry.prometheus_text()
+
+
+def snapshot():
+    return registry.snapshot()
+
+
+def dump(path=METRICS_FILE):
+    if path:
+        registry.dump(path)
+
+
+@atexit.register
+def _dump_on_exit():
+    if ENABLED and METRICS_FILE:
+        dump(METRICS_FILE)
+
+
+# =============================
+# HOOKS
+# =============================
+
+def instrument_node(name, func):
+    """Wrap a graph node (sync or async) with latency and error metrics."""
+    if func is None:
+        return None
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(state):
+            if not ENABLED:
+                return await func(state)
+            token = _current_node.set(name)
+            started = time.perf_counter()
+            try:
+                return await func(state)
+            except Exception:
+                registry.inc("node_errors_total", node=name)
+                raise
+            finally:
+                registry.observe("node_latency_seconds", time.perf_counter() - started, node=name)
+                _current_node.reset(token)
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(state):
+        if not ENABLED:
+            return func(state)
+        token = _current_node.set(name)
+        started = time.perf_counter()
+        try:
+            return func(state)
+        except Exception:
+            registry.inc("node_errors_total", node=name)
+            raise
+        finally:
+            registry.observe("node_latency_seconds", time.perf_counter() - started, node=name)
+            _current_node.reset(token)
+
+    return wrapper
+
+
+def record_llm(seconds, message=None, structured=False):
+    if not ENABLED:
+        return
+    node = _current_node.get()
+    kind = "structured" if structured else "text"
+    registry.observe("llm_latency_seconds", seconds, node=node, kind=kind)
+    # the model that answered; differs from the node's tier after a fallback
+    model = (getattr(message, "response_metadata", None) or {}).get("model_name")
+    if model:
+        registry.inc("llm_calls_total", node=node, model=model)
+
+    usage = getattr(message, "usage_metadata", None) or {}
+    if usage:
+        registry.observe("llm_prompt_tokens", usage.get("input_tokens", 0), node=node)
+        registry.observe("llm_completion_tokens", usage.get("output_tokens", 0), node=node)
+        registry.inc("llm_tokens_total", usage.get("input_tokens", 0), node=node, type="prompt")
+        registry.inc("llm_tokens_total", usage.get("output_tokens", 0), node=node, type="completion")
+
+
+def current_node():
+    return _current_node.get()
+
+
+@contextlib.contextmanager
+def node_label(name):
+    """Attribute metrics recorded inside to node `name` (e.g. on another thread)."""
+    token = _current_node.set(name)
+    try:
+        yield
+    finally:
+        _current_node.reset(token)
+
+
+def record_search_error(seconds, exc):
+    if not ENABLED:
+        return
+    node = _current_node.get()
+    registry.observe("search_latency_seconds", seconds, node=node, cache="error")
+    registry.inc("search_errors_total", node=node, error=type(exc).__name__)
+
+
+def record_search(seconds, cached, contents):
+    if not ENABLED:
+        return
+    node = _current_node.get()
+    cache = "hit" if cached else "miss"
+    registry.observe("search_latency_seconds", seconds, node=node, cache=cache)
+    registry.inc("search_cache_total", node=node, result=cache)
+    if contents:
+        size = sum(len(c.encode("utf-8")) for c in contents)
+        registry.observe("search_payload_bytes", size, node=node)
+
+
+# =============================
+# HTTP ENDPOINT
+# =============================
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body = prometheus_text().encode("utf-8")
+            content_type = "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body = json.dumps(snapshot()).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_http_server(port=None, host="127.0.0.1"):
+    """Serve /metrics (Prometheus text) and /metrics.json from a daemon thread."""
+    port = int(port or os.getenv("METRICS_PORT", "9464"))
+    server = ThreadingHTTPServer((host, port), _Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
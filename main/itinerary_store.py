@@ -0,0 +1,292 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from main import instrumentation
+from main.context import has_answer
+from main.search_cache import normalize_query
+
+# =============================
+# CONFIG
+# =============================
+# A few (destination, days) pairs ("3 days in Jaipur") make up most
+# itinerary traffic. An offline job generates them once for every place in
+# data/tourism_data.txt and itinerary_node serves those from SQLite instead
+# of calling the LLM. Only the first turn of a conversation is served; later
+# turns may ask for changes the stored text doesn't have.
+#
+#   python -m main.itinerary_store              # precompute missing entries
+#   python -m main.itinerary_store --refresh    # regenerate expiring entries
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STORE_PATH = os.getenv(
+    "ITINERARY_STORE_PATH", os.path.join(BASE_DIR, "itineraries.sqlite3")
+)
+
+ENABLED = os.getenv("ITINERARY_STORE_ENABLED", "1") == "1"
+DAYS = [int(d) for d in os.getenv("ITINERARY_STORE_DAYS", "1,2,3,4,5,7").split(",")]
+TTL = int(os.getenv("ITINERARY_STORE_TTL", str(30 * 24 * 60 * 60)))
+
+# background refresh in the serving process (0 = only via --refresh)
+REFRESH_INTERVAL = float(os.getenv("ITINERARY_REFRESH_INTERVAL", "0"))
+# entries expiring within this many seconds are regenerated
+REFRESH_AHEAD = int(os.getenv("ITINERARY_REFRESH_AHEAD", str(3 * 24 * 60 * 60)))
+REFRESH_BATCH = int(os.getenv("ITINERARY_REFRESH_BATCH", "20"))
+
+# hit counts are written in batches, not on every read
+HIT_FLUSH_EVERY = 50
+
+stats = {"hits": 0, "misses": 0, "bypassed": 0, "generated": 0, "refreshed": 0}
+
+instrumentation.register_collector("itinerary_store", lambda: stats)
+
+
+def destination_key(destination):
+    """Place-index name for a destination ("jaipur" -> "Jaipur"), else normalised."""
+    from main.place_index import load_index
+
+    places = load_index().find_places(destination or "")
+    if len(places) == 1:
+        return places[0]["name"]
+    return normalize_query(destination or "")
+
+
+# =============================
+# STORE
+# =============================
+
+class ItineraryStore:
+    def __init__(self, path=STORE_PATH, ttl=TTL):
+        self.path = path
+        self.ttl = ttl
+        self._conn = None
+        self._lock = threading.Lock()
+        self._hits = Counter()
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS itineraries (
+                    destination TEXT NOT NULL,
+                    days INTEGER NOT NULL,
+                    itinerary BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (destination, days)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS itineraries_expires
+                    ON itineraries (expires_at);
+                """
+            )
+        return self._conn
+
+    def exists(self):
+        return self._conn is not None or os.path.exists(self.path)
+
+    def get(self, destination, days):
+        key = (destination_key(destination), days)
+        with self._lock:
+            try:
+                row = self._db().execute(
+                    "SELECT itinerary, expires_at FROM itineraries WHERE destination = ? AND days = ?",
+                    key,
+                ).fetchone()
+            except sqlite3.Error:
+                row = None
+
+            if row is None or row[1] < time.time():
+                stats["misses"] += 1
+                return None
+
+            stats["hits"] += 1
+            self._hits[key] += 1
+            if sum(self._hits.values()) >= HIT_FLUSH_EVERY:
+                self._flush_hits()
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, destination, days, text):
+        key = (destination_key(destination), days)
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT INTO itineraries (destination, days, itinerary, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(destination, days) DO UPDATE SET "
+                "itinerary = excluded.itinerary, created_at = excluded.created_at, "
+                "expires_at = excluded.expires_at",
+                (*key, zlib.compress(text.encode("utf-8")), now, now + self.ttl),
+            )
+            db.commit()
+
+    def _flush_hits(self):
+        hits, self._hits = self._hits, Counter()
+        try:
+            db = self._db()
+            db.executemany(
+                "UPDATE itineraries SET hits = hits + ? WHERE destination = ? AND days = ?",
+                [(n, dest, days) for (dest, days), n in hits.items()],
+            )
+            db.commit()
+        except sqlite3.Error:
+            pass
+
+    def keys(self):
+        with self._lock:
+            return {tuple(r) for r in self._db().execute("SELECT destination, days FROM itineraries")}
+
+    def expiring(self, within=REFRESH_AHEAD, limit=REFRESH_BATCH):
+        """Entries expiring soonest, most requested first."""
+        with self._lock:
+            self._flush_hits()
+            return [tuple(r) for r in self._db().execute(
+                "SELECT destination, days FROM itineraries WHERE expires_at < ? "
+                "ORDER BY hits DESC, expires_at LIMIT ?",
+                (time.time() + within, limit),
+            )]
+
+
+_store = None
+_store_lock = threading.Lock()
+_refresher = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ItineraryStore()
+    return _store
+
+
+def hit_rate():
+    total = stats["hits"] + stats["misses"]
+    return stats["hits"] / total if total else 0.0
+
+
+# =============================
+# SERVING
+# =============================
+
+def lookup(state):
+    """Stored itinerary for a first-turn itinerary question, else None."""
+    if not ENABLED or state.get("days") not in DAYS or not state.get("destination"):
+        return None
+    store = get_store()
+    if not store.exists():
+        # nothing precomputed yet
+        return None
+    if has_answer(state.get("messages", [])):
+        stats["bypassed"] += 1
+        return None
+
+    _start_refresher()
+    return store.get(state["destination"], state["days"])
+
+
+# =============================
+# PRECOMPUTE / REFRESH
+# =============================
+
+def generate(destination, days):
+    # same prompt and model route as itinerary_node, without history
+    from langchain_core.messages import HumanMessage
+
+    from main import agent
+
+    state = {
+        "messages": [HumanMessage(content=f"Plan {days} days in {destination}")],
+        "destination": destination,
+        "days": days,
+    }
+    return agent.call_llm(state, agent._itinerary_prompt(state), node="itinerary").content
+
+
+def _build(pairs, store, concurrency, stat):
+    def one(pair):
+        try:
+            store.put(*pair, generate(*pair))
+        except Exception as exc:
+            return pair, exc
+        stats[stat] += 1
+        return pair, None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, pairs))
+
+
+def precompute(days=DAYS, destinations=None, concurrency=4, store=None):
+    """Generate every (place, days) pair not in the store yet."""
+    from main.place_index import load_index
+
+    store = store or get_store()
+    destinations = destinations or [p["name"] for p in load_index().places]
+    have = store.keys()
+    pairs = [(d, n) for d in destinations for n in days if (destination_key(d), n) not in have]
+    return _build(pairs, store, concurrency, "generated")
+
+
+def refresh(concurrency=4, store=None):
+    """Regenerate entries close to expiry, most requested first."""
+    store = store or get_store()
+    return _build(store.expiring(), store, concurrency, "refreshed")
+
+
+def _start_refresher():
+    global _refresher
+    if REFRESH_INTERVAL <= 0 or _refresher is not None:
+        return
+
+    def run():
+        while True:
+            time.sleep(REFRESH_INTERVAL)
+            try:
+                refresh(concurrency=1)
+            except sqlite3.Error:
+                continue
+
+    with _store_lock:
+        if _refresher is None:
+            _refresher = threading.Thread(target=run, name="itinerary-refresh", daemon=True)
+            _refresher.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute itineraries for known destinations")
+    parser.add_argument("--days", default=",".join(map(str, DAYS)),
+                        help="comma-separated day counts")
+    parser.add_argument("--destination", action="append",
+                        help="only this destination (repeatable); default: every place in the index")
+    parser.add_argument("--refresh", action="store_true",
+                        help="regenerate entries that expire soon instead")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.refresh:
+        results = refresh(concurrency=args.concurrency)
+    else:
+        days = [int(d) for d in args.days.split(",")]
+        results = precompute(days, args.destination, concurrency=args.concurrency)
+
+    failed = [(pair, exc) for pair, exc in results if exc is not None]
+    for (destination, days), exc in failed:
+        print(f"❌ {destination} ({days} days): {exc}")
+    print(
+        f"✅ {len(results) - len(failed)} itineraries written to {STORE_PATH} "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
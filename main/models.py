@@ -0,0 +1,152 @@
+import os
+import threading
+
+from main import instrumentation
+
+# =============================
+# MODEL TIERS
+# =============================
+# Each tier is one Groq model configuration. Nodes are routed to a tier, so
+# the small structured calls (classify, risk, budget) can use a fast model
+# while user-facing text and the eval judge use a larger one.
+#
+#   LLM_MODEL_<TIER>   model id for a tier, e.g. LLM_MODEL_QUALITY=...
+#   LLM_ROUTE_<NODE>   tier for a node, e.g. LLM_ROUTE_ITINERARY=quality
+
+TIERS = {
+    "fast": {
+        "model": os.getenv("LLM_MODEL_FAST", "llama-3.1-8b-instant"),
+        "temperature": 0.0,
+        "timeout": 10,
+        "fallback": "quality",
+    },
+    "default": {
+        "model": os.getenv("LLM_MODEL_DEFAULT", "llama-3.1-8b-instant"),
+        "temperature": 0.2,
+        "timeout": 30,
+        "fallback": "quality",
+    },
+    "quality": {
+        "model": os.getenv("LLM_MODEL_QUALITY", "llama-3.3-70b-versatile"),
+        "temperature": 0.2,
+        "timeout": 60,
+        "fallback": "default",
+    },
+}
+
+ROUTES = {
+    "classify": "fast",
+    "risk": "fast",
+    "budget": "fast",
+    "itinerary": "default",
+    "executor": "default",
+    "judge": "quality",
+}
+DEFAULT_TIER = "default"
+
+# try the tier's fallback model on a timeout or rate limit
+FALLBACK_ENABLED = os.getenv("LLM_FALLBACK_ENABLED", "1") == "1"
+
+stats = {"models_built": 0, "runnables_built": 0}
+
+instrumentation.register_collector("models", lambda: stats)
+
+
+def tier_for(node):
+    tier = os.getenv(f"LLM_ROUTE_{(node or '').upper()}") or ROUTES.get(node, DEFAULT_TIER)
+    if tier not in TIERS:
+        raise ValueError(f"Unknown model tier for {node}: {tier}")
+    return tier
+
+
+# =============================
+# MODELS (built on first use)
+# =============================
+
+_models = {}
+_runnables = {}
+# reentrant: building a runnable builds its models
+_lock = threading.RLock()
+
+
+def _make_model(tier):
+    from langchain_groq import ChatGroq
+
+    spec = TIERS[tier]
+    return ChatGroq(
+        api_key=os.getenv("GROQ_API_KEY"),
+        model=spec["model"],
+        temperature=spec["temperature"],
+        timeout=spec["timeout"],
+        # with a fallback, move on instead of retrying the same model
+        max_retries=1 if FALLBACK_ENABLED and spec.get("fallback") else 2,
+    )
+
+
+def get_model(tier=DEFAULT_TIER):
+    model = _models.get(tier)
+    if model is None:
+        with _lock:
+            model = _models.get(tier)
+            if model is None:
+                model = _models[tier] = _make_model(tier)
+                stats["models_built"] += 1
+    return model
+
+
+def use_model(model, tier=None):
+    """Swap in a stand-in for one tier, or for every tier (tier=None)."""
+    with _lock:
+        for name in [tier] if tier else TIERS:
+            _models[name] = model
+        _runnables.clear()
+
+
+def _fallback_errors():
+    import httpx
+    from groq import APITimeoutError, RateLimitError
+
+    return (RateLimitError, APITimeoutError, httpx.TimeoutException)
+
+
+def _bind(model, schema, include_raw):
+    if schema is None:
+        return model
+    return model.with_structured_output(schema, include_raw=include_raw)
+
+
+def _build(tier, schema, include_raw):
+    from langchain_core.runnables import Runnable
+
+    primary_model = get_model(tier)
+    primary = _bind(primary_model, schema, include_raw)
+
+    fallback = TIERS[tier].get("fallback")
+    if not FALLBACK_ENABLED or not fallback:
+        return primary
+    fallback_model = get_model(fallback)
+    # stand-ins shared across tiers have nothing to fall back to
+    if fallback_model is primary_model or not isinstance(primary, Runnable):
+        return primary
+
+    return primary.with_fallbacks(
+        [_bind(fallback_model, schema, include_raw)],
+        exceptions_to_handle=_fallback_errors(),
+    )
+
+
+def runnable_for(node, schema=None, include_raw=False):
+    """The model (structured if schema is given) a node should call.
+
+    Built once per (tier, schema, include_raw); with_structured_output and
+    with_fallbacks aren't rebuilt on every call.
+    """
+    key = (tier_for(node), schema, include_raw)
+    runnable = _runnables.get(key)
+    if runnable is None:
+        with _lock:
+            runnable = _runnables.get(key)
+            if runnable is None:
+                runnable = _runnables[key] = _build(*key)
+                stats["runnables_built"] += 1
+    return runnable
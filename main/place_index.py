@@ -0,0 +1,248 @@
+import json
+import os
+import re
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_FILE = os.path.join(BASE_DIR, "data", "tourism_data.txt")
+INDEX_FILE = os.path.join(BASE_DIR, "data", "place_index.json")
+
+# =============================
+# FIELD LABELS
+# =============================
+
+FIELD_RE = re.compile(
+    r"^(travel routes|best time(?: to visit)?|hotels|local food|"
+    r"cultural tips?|entry fees?|timings|budget)\s*:\s*(.*)$",
+    re.I,
+)
+
+FIELD_NAMES = {
+    "travel routes": "travel_routes",
+    "best time": "best_time",
+    "best time to visit": "best_time",
+    "hotels": "hotels",
+    "local food": "local_food",
+    "cultural tip": "cultural_tips",
+    "cultural tips": "cultural_tips",
+    "entry fee": "entry_fees",
+    "entry fees": "entry_fees",
+    "timings": "timings",
+    "budget": "budget",
+}
+
+FIELD_TITLES = {
+    "travel_routes": "Travel routes",
+    "best_time": "Best time to visit",
+    "hotels": "Hotels",
+    "local_food": "Local food",
+    "cultural_tips": "Cultural tips",
+    "entry_fees": "Entry fees",
+    "timings": "Timings",
+    "budget": "Budget",
+}
+
+# question wording -> field; only phrasings that ask for the whole field
+# ("what food should I avoid" is not asking for the dish list)
+QUESTION_FIELDS = {
+    "timings": re.compile(r"\b(timings?|opening hours|opening time|closing time|what time does \w+(?: \w+)? open)\b"),
+    "best_time": re.compile(r"\b(best (?:time|season|months?) (?:to|for) (?:visit|go|travel)|when (?:to|should i) (?:visit|go)|ideal time to visit)\b"),
+    "entry_fees": re.compile(r"\b(entry fees?|entrance fees?|entry tickets?|ticket price|admission(?: fees?)?)\b"),
+    "hotels": re.compile(r"\b(hotels?|where to stay|accommodation)\b"),
+    "local_food": re.compile(r"\b(local food|famous food|food to try|must try food|local cuisine|famous dishes|local dishes|what to eat)\b"),
+    "cultural_tips": re.compile(r"\b(cultural tips?|etiquette|customs|dress code)\b"),
+    "travel_routes": re.compile(r"\b(how to reach|how to get to|how do i get to|travel routes?|nearest airport)\b"),
+    "budget": re.compile(r"\b(budget|cost per day|daily cost|daily budget)\b"),
+}
+
+# words that narrow the question beyond what the stored field says ("food to
+# avoid", "best time of day", "cheap hotels"); such questions go to the LLM
+QUALIFIER_RE = re.compile(
+    r"\b(avoid|not|don'?t|without|except|day|night|hours?|morning|evening|sunrise|sunset"
+    r"|price|cheap|cheapest|luxury|budget|vegetarian|vegan|halal|near|nearby|during"
+    r"|monsoon|winter|summer|kids|children|today|tomorrow|weekend)\b"
+)
+
+# "Budget for Manali for 4 days" needs arithmetic, leave it to the LLM
+DAYS_RE = re.compile(r"\b\d+\s*-?\s*(?:day|days|night|nights)\b")
+
+# "Amber Fort ₹100–₹500" -> "Amber Fort" is a landmark alias of Jaipur
+LANDMARK_RE = re.compile(
+    r"^((?:[A-Z][\w'-]+\s+){1,3}?[A-Z][\w'-]+)\s+(?:approx|₹|free|permit|small|charges|\d)"
+)
+
+# =============================
+# PARSER
+# =============================
+
+
+def _aliases(name: str):
+    name = name.strip().rstrip(":")
+    aliases = {name.lower()}
+
+    base = name
+    paren = re.search(r"\(([^)]+)\)", name)
+    if paren:
+        aliases.add(paren.group(1).strip().lower())
+        base = name[:paren.start()].strip()
+        aliases.add(base.lower())
+
+    for part in re.split(r"\s+[–-]\s+", base):
+        aliases.add(part.strip().lower())
+
+    if "&" in base:
+        aliases.add(base.replace("&", "and").lower())
+        aliases.update(part.strip().lower() for part in base.split("&"))
+
+    if base.lower().endswith(" national park"):
+        aliases.add(base[: -len(" national park")].lower())
+
+    return sorted(a for a in aliases if a)
+
+
+def parse(text: str):
+    lines = [line.strip() for line in text.splitlines()]
+    content = [(i, line) for i, line in enumerate(lines) if line]
+
+    def is_field(pos):
+        return pos < len(content) and FIELD_RE.match(content[pos][1])
+
+    places = []
+    state = None
+    current = None
+
+    for pos, (_, line) in enumerate(content):
+        field = FIELD_RE.match(line)
+
+        if field:
+            if current is not None:
+                key = FIELD_NAMES[field.group(1).lower()]
+                current["fields"][key] = field.group(2).strip()
+            continue
+
+        if is_field(pos + 1):
+            name = re.sub(r"\s*:$", "", line)
+            current = {"name": name, "state": state, "aliases": _aliases(name), "fields": {}}
+            places.append(current)
+        elif pos + 2 < len(content) and not is_field(pos + 1) and is_field(pos + 2):
+            # a state heading is immediately followed by a place name
+            state = line
+            current = None
+        else:
+            # free text between blocks
+            current = None
+
+    for place in places:
+        landmark = LANDMARK_RE.match(place["fields"].get("entry_fees", ""))
+        if landmark:
+            place["aliases"] = sorted(set(place["aliases"]) | {landmark.group(1).lower()})
+
+    return places
+
+
+# =============================
+# COMPILED INDEX
+# =============================
+
+
+def compile_index(source=SOURCE_FILE, target=INDEX_FILE):
+    with open(source, encoding="utf-8") as f:
+        places = parse(f.read())
+
+    with open(target, "w", encoding="utf-8") as f:
+        json.dump(places, f, ensure_ascii=False, separators=(",", ":"))
+
+    return places
+
+
+class PlaceIndex:
+    def __init__(self, places):
+        self.places = places
+        self.by_alias = {}
+        for place in places:
+            for alias in place["aliases"]:
+                self.by_alias.setdefault(alias, place)
+
+        # longest aliases first so "agra (taj mahal)" wins over "agra"
+        aliases = sorted(self.by_alias, key=len, reverse=True)
+        self.alias_re = re.compile(
+            r"\b(" + "|".join(re.escape(a) for a in aliases) + r")\b"
+        ) if aliases else None
+
+    def get(self, name: str):
+        return self.by_alias.get(name.strip().lower())
+
+    def lookup(self, name: str, field: str):
+        place = self.get(name)
+        return place["fields"].get(field) if place else None
+
+    def find_places(self, text: str):
+        if self.alias_re is None:
+            return []
+
+        found = []
+        for match in self.alias_re.finditer(text.lower()):
+            place = self.by_alias[match.group(1)]
+            if place not in found:
+                found.append(place)
+        return found
+
+    def answer(self, question: str):
+        """Answer a single-field question about one known place, else None."""
+        text = question.lower()
+
+        matches = [(f, pattern.search(text)) for f, pattern in QUESTION_FIELDS.items()]
+        matches = [(f, m) for f, m in matches if m]
+        if len(matches) != 1:
+            return None
+        field, match = matches[0]
+
+        # the field's own wording ("ticket price", "opening hours") doesn't count
+        if QUALIFIER_RE.search(text[:match.start()] + " " + text[match.end():]):
+            return None
+
+        if field == "budget" and DAYS_RE.search(text):
+            return None
+
+        places = self.find_places(text)
+        if len(places) != 1 or field not in places[0]["fields"]:
+            return None
+
+        place = places[0]
+        where = f"{place['name']}, {place['state']}" if place["state"] else place["name"]
+        return {
+            "place": place["name"],
+            "field": field,
+            "text": f"{where}\n{FIELD_TITLES[field]}: {place['fields'][field]}",
+        }
+
+
+_index = None
+
+
+def load_index():
+    global _index
+    if _index is None:
+        stale = not os.path.exists(INDEX_FILE) or (
+            os.path.exists(SOURCE_FILE)
+            and os.path.getmtime(INDEX_FILE) < os.path.getmtime(SOURCE_FILE)
+        )
+        if stale:
+            try:
+                places = compile_index()
+            except OSError:
+                with open(SOURCE_FILE, encoding="utf-8") as f:
+                    places = parse(f.read())
+        else:
+            with open(INDEX_FILE, encoding="utf-8") as f:
+                places = json.load(f)
+        _index = PlaceIndex(places)
+    return _index
+
+
+def answer_question(question: str):
+    return load_index().answer(question)
+
+
+if __name__ == "__main__":
+    places = compile_index()
+    print(f"✅ Indexed {len(places)} places at: {INDEX_FILE}")
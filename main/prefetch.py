@@ -0,0 +1,170 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from main import instrumentation
+
+# =============================
+# SPECULATIVE SEARCH PREFETCH
+# =============================
+# The executor searches on the raw question, which doesn't depend on the
+# classification, so the search can start alongside classify_node. Only an
+# id goes into the graph state; the running search lives here until the
+# executor takes it or classify discards it (non_travel, itinerary, cached).
+
+ENABLED = os.getenv("SEARCH_PREFETCH", "0") == "1"
+WORKERS = int(os.getenv("SEARCH_PREFETCH_WORKERS", "8"))
+# prefetches nobody claimed within this many seconds are dropped
+MAX_AGE = float(os.getenv("SEARCH_PREFETCH_MAX_AGE", "120"))
+
+stats = {
+    "started": 0,
+    "used": 0,
+    "wasted": 0,
+    "saved_seconds": 0.0,
+    "wasted_search_seconds": 0.0,
+}
+
+instrumentation.register_collector("prefetch", lambda: stats)
+
+_pending = {}
+_lock = threading.Lock()
+_pool = None
+
+
+class _Prefetch:
+    def __init__(self, handle):
+        self.handle = handle
+        self.started = time.perf_counter()
+        self.duration = None
+
+    def finished(self):
+        self.duration = time.perf_counter() - self.started
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="prefetch")
+    return _pool
+
+
+def _register(entry):
+    prefetch_id = uuid.uuid4().hex
+    now = time.perf_counter()
+
+    with _lock:
+        for key in [k for k, e in _pending.items() if now - e.started > MAX_AGE]:
+            _cancel(_pending.pop(key))
+        _pending[prefetch_id] = entry
+        stats["started"] += 1
+
+    return prefetch_id
+
+
+def _cancel(entry):
+    if isinstance(entry.handle, asyncio.Task):
+        # may be called from another thread than the task's loop
+        entry.handle.get_loop().call_soon_threadsafe(entry.handle.cancel)
+    else:
+        entry.handle.cancel()
+    stats["wasted"] += 1
+    if entry.duration is not None:
+        stats["wasted_search_seconds"] += entry.duration
+
+
+def _claim(prefetch_id):
+    with _lock:
+        return _pending.pop(prefetch_id, None) if prefetch_id else None
+
+
+def _used(entry, waited):
+    # a search that finished during classification saved its whole duration;
+    # one still running saved the part that overlapped
+    saved = max(0.0, (entry.duration or 0.0) - waited)
+    with _lock:
+        stats["used"] += 1
+        stats["saved_seconds"] += saved
+    if instrumentation.ENABLED:
+        instrumentation.registry.observe("prefetch_saved_seconds", saved)
+
+
+def start(search, question: str, node=None):
+    if not ENABLED:
+        return None
+    # pool threads don't inherit the caller's node label; pass it along
+    node = node or instrumentation.current_node()
+
+    def run():
+        try:
+            with instrumentation.node_label(node):
+                return search(question)
+        finally:
+            entry.finished()
+
+    entry = _Prefetch(None)
+    entry.handle = _executor().submit(run)
+    return _register(entry)
+
+
+def astart(asearch, question: str, node=None):
+    if not ENABLED:
+        return None
+    node = node or instrumentation.current_node()
+
+    async def run():
+        try:
+            with instrumentation.node_label(node):
+                return await asearch(question)
+        finally:
+            entry.finished()
+
+    entry = _Prefetch(None)
+    entry.handle = asyncio.get_running_loop().create_task(run())
+    return _register(entry)
+
+
+def take(prefetch_id):
+    """Result of a sync prefetch, waiting for it if needed; None if unknown."""
+    entry = _claim(prefetch_id)
+    if entry is None:
+        return None
+
+    started = time.perf_counter()
+    try:
+        result = entry.handle.result()
+    except Exception:
+        return None
+    _used(entry, time.perf_counter() - started)
+    return result
+
+
+async def atake(prefetch_id):
+    entry = _claim(prefetch_id)
+    if entry is None:
+        return None
+
+    started = time.perf_counter()
+    try:
+        result = await entry.handle
+    except Exception:
+        return None
+    _used(entry, time.perf_counter() - started)
+    return result
+
+
+def discard(prefetch_id):
+    entry = _claim(prefetch_id)
+    if entry is not None:
+        with _lock:
+            _cancel(entry)
+
+
+def waste_ratio():
+    done = stats["used"] + stats["wasted"]
+    return stats["wasted"] / done if done else 0.0
@@ -0,0 +1,168 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Always write file in project root
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_FILE = os.getenv(
+    "SEARCH_CACHE_PATH", os.path.join(BASE_DIR, "search_cache.sqlite3")
+)
+
+MEMORY_SIZE = int(os.getenv("SEARCH_CACHE_MEMORY_SIZE", "512"))
+# expired rows are deleted from SQLite once every this many writes
+PURGE_EVERY = int(os.getenv("SEARCH_CACHE_PURGE_EVERY", "200"))
+
+# =============================
+# TTL PER QUERY CLASS (seconds)
+# =============================
+
+QUERY_CLASSES = [
+    ("advisory", re.compile(r"\b(advisory|advisories|risk|safe|safety|warning|alert)\b")),
+    ("cost", re.compile(r"\b(cost|costs|budget|price|prices|per day|expense|expenses)\b")),
+]
+
+TTL_BY_CLASS = {
+    "advisory": int(os.getenv("SEARCH_TTL_ADVISORY", str(60 * 60))),
+    "cost": int(os.getenv("SEARCH_TTL_COST", str(7 * 24 * 60 * 60))),
+    "default": int(os.getenv("SEARCH_TTL_DEFAULT", str(24 * 60 * 60))),
+}
+
+
+def normalize_query(query: str) -> str:
+    query = re.sub(r"[^\w\s]", " ", query.lower())
+    return " ".join(query.split())
+
+
+def query_class(normalized: str) -> str:
+    for name, pattern in QUERY_CLASSES:
+        if pattern.search(normalized):
+            return name
+    return "default"
+
+
+class SearchCache:
+    """Two-tier (in-process LRU + SQLite) cache of search results.
+
+    The lock only guards the in-memory LRU; each thread has its own SQLite
+    connection, so a disk read or commit never holds up other searches.
+    """
+
+    def __init__(self, path=CACHE_FILE, memory_size=MEMORY_SIZE, purge_every=PURGE_EVERY):
+        self.path = path
+        self.memory_size = memory_size
+        self.purge_every = purge_every
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes_since_purge = 0
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "purged": 0}
+
+    def _db(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.executescript(
+                """
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    key TEXT PRIMARY KEY,
+                    results TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS search_cache_expires
+                    ON search_cache (expires_at);
+                """
+            )
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, key, results, expires_at):
+        self._memory[key] = (results, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_memory(self, query: str):
+        """In-memory tier only: never touches disk, safe on an event loop."""
+        key = normalize_query(query)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[1] > time.time():
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[0]
+            if entry:
+                del self._memory[key]
+        return None
+
+    def get(self, query: str):
+        results = self.get_memory(query)
+        if results is not None:
+            return results
+
+        key = normalize_query(query)
+        try:
+            row = self._db().execute(
+                "SELECT results, expires_at FROM search_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+        except sqlite3.Error:
+            row = None
+
+        with self._lock:
+            if row and row[1] > time.time():
+                results = json.loads(row[0])
+                self._remember(key, results, row[1])
+                self.stats["disk_hits"] += 1
+                return results
+
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, query: str, results):
+        key = normalize_query(query)
+        expires_at = time.time() + TTL_BY_CLASS[query_class(key)]
+
+        with self._lock:
+            self._remember(key, results, expires_at)
+            self.stats["writes"] += 1
+            self._writes_since_purge += 1
+            purge = self._writes_since_purge >= self.purge_every
+            if purge:
+                self._writes_since_purge = 0
+
+        try:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?)",
+                (key, json.dumps(results), expires_at),
+            )
+            db.commit()
+            if purge:
+                self.purge_expired()
+        except sqlite3.Error:
+            pass
+
+    def purge_expired(self):
+        """Drop expired entries; set() calls this every purge_every writes."""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (_, exp) in self._memory.items() if exp <= now]:
+                del self._memory[key]
+        db = self._db()
+        deleted = db.execute("DELETE FROM search_cache WHERE expires_at <= ?", (now,)).rowcount
+        db.commit()
+        with self._lock:
+            self.stats["purged"] += deleted
+
+    def hit_rate(self) -> float:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+
+search_cache = SearchCache()
@@ -0,0 +1,383 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+
+from main import instrumentation
+
+# =============================
+# CONFIG
+# =============================
+
+BASE_URL = os.getenv("TAVILY_BASE_URL", "https://api.tavily.com")
+# total time one search() may take, hedge included
+DEADLINE = float(os.getenv("SEARCH_DEADLINE", "4.0"))
+CONNECT_TIMEOUT = float(os.getenv("SEARCH_CONNECT_TIMEOUT", "1.0"))
+# send a duplicate request if the first hasn't answered after this (0 = off)
+HEDGE_AFTER = float(os.getenv("SEARCH_HEDGE_AFTER", "0"))
+POOL_SIZE = int(os.getenv("SEARCH_POOL_SIZE", "20"))
+
+# consecutive failures before the breaker opens, and how long it stays open
+BREAKER_FAILURES = int(os.getenv("SEARCH_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("SEARCH_BREAKER_RESET", "30"))
+
+
+class SearchError(Exception):
+    pass
+
+
+class SearchTimeout(SearchError):
+    pass
+
+
+class CircuitOpenError(SearchError):
+    pass
+
+
+class SearchHTTPError(SearchError):
+    def __init__(self, status_code, body=""):
+        super().__init__(f"Search backend returned {status_code}: {body[:200]}")
+        self.status_code = status_code
+
+
+# =============================
+# CIRCUIT BREAKER
+# =============================
+
+class CircuitBreaker:
+    """closed -> open after N consecutive failures -> half_open after the
+    reset timeout, where a single trial call decides between the two."""
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(self, failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opens = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+
+            if self.state == self.HALF_OPEN:
+                if self._trial_running:
+                    return False
+                self._trial_running = True
+
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opens += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_running = False
+
+
+# =============================
+# CLIENT
+# =============================
+# One pooled httpx client per process (and one per event loop for async),
+# so every search reuses warm keep-alive connections to Tavily.
+
+
+class SearchClient:
+    def __init__(
+        self,
+        api_key=None,
+        base_url=BASE_URL,
+        deadline=DEADLINE,
+        hedge_after=HEDGE_AFTER,
+        pool_size=POOL_SIZE,
+        breaker=None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.deadline = deadline
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+
+        self._limits = httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        )
+        self._client = httpx.Client(headers=self.headers, limits=self._limits)
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._hedge_pool = None
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+        }
+        self.aio = AsyncSearchAPI(self)
+
+    def metrics(self):
+        states = {CircuitBreaker.CLOSED: 0, CircuitBreaker.HALF_OPEN: 1, CircuitBreaker.OPEN: 2}
+        return {
+            **self.stats,
+            "breaker_state": states[self.breaker.state],
+            "breaker_opens": self.breaker.opens,
+            "consecutive_failures": self.breaker.failures,
+        }
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _timeout(self, remaining):
+        return httpx.Timeout(remaining, connect=min(CONNECT_TIMEOUT, remaining))
+
+    @staticmethod
+    def _result(response):
+        if response.status_code != 200:
+            raise SearchHTTPError(response.status_code, response.text)
+        return response.json()
+
+    def _payload(self, query, params):
+        return {"query": query, **params}
+
+    def _admit(self):
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError("Search backend unhealthy, failing fast")
+        self._count("requests")
+
+    def _finish(self, error):
+        if error is None:
+            self.breaker.record_success()
+            return
+        self._count("failures")
+        if isinstance(error, SearchTimeout):
+            self._count("timeouts")
+        self.breaker.record_failure()
+
+    # =============================
+    # SYNC
+    # =============================
+
+    def _post(self, payload, deadline_at):
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise SearchTimeout("Search deadline exceeded")
+        try:
+            response = self._client.post(
+                self.base_url + "/search", json=payload, timeout=self._timeout(remaining)
+            )
+        except httpx.TimeoutException as exc:
+            raise SearchTimeout(str(exc) or "Search timed out") from exc
+        except httpx.HTTPError as exc:
+            raise SearchError(str(exc)) from exc
+        return self._result(response)
+
+    def _pool(self):
+        if self._hedge_pool is None:
+            with self._lock:
+                if self._hedge_pool is None:
+                    self._hedge_pool = ThreadPoolExecutor(
+                        max_workers=2 * self._limits.max_connections,
+                        thread_name_prefix="search-hedge",
+                    )
+        return self._hedge_pool
+
+    def _hedged(self, payload, deadline_at):
+        first = self._pool().submit(self._post, payload, deadline_at)
+        done, _ = wait([first], timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        self._count("hedges")
+        second = self._pool().submit(self._post, payload, deadline_at)
+        pending = {first, second}
+        error = None
+
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=max(0.0, deadline_at - time.monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                raise SearchTimeout("Search deadline exceeded")
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+
+        raise error
+
+    def search(self, query: str, deadline=None, **params):
+        """Same call shape as TavilyClient.search; raises SearchError."""
+        self._admit()
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        payload = self._payload(query, params)
+
+        try:
+            if self.hedge_after and self.hedge_after < (deadline or self.deadline):
+                result = self._hedged(payload, deadline_at)
+            else:
+                result = self._post(payload, deadline_at)
+        except Exception as exc:
+            self._finish(exc)
+            raise
+        self._finish(None)
+        return result
+
+    # =============================
+    # ASYNC
+    # =============================
+
+    def _async_client(self):
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(headers=self.headers, limits=self._limits)
+            self._async_clients[loop] = client
+        return client
+
+    async def _apost(self, payload, deadline_at):
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise SearchTimeout("Search deadline exceeded")
+        try:
+            response = await self._async_client().post(
+                self.base_url + "/search", json=payload, timeout=self._timeout(remaining)
+            )
+        except httpx.TimeoutException as exc:
+            raise SearchTimeout(str(exc) or "Search timed out") from exc
+        except httpx.HTTPError as exc:
+            raise SearchError(str(exc)) from exc
+        return self._result(response)
+
+    async def _ahedged(self, payload, deadline_at):
+        first = asyncio.ensure_future(self._apost(payload, deadline_at))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        self._count("hedges")
+        second = asyncio.ensure_future(self._apost(payload, deadline_at))
+        pending = {first, second}
+        error = None
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(0.0, deadline_at - time.monotonic()),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    raise SearchTimeout("Search deadline exceeded")
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def asearch(self, query: str, deadline=None, **params):
+        self._admit()
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        payload = self._payload(query, params)
+
+        try:
+            if self.hedge_after and self.hedge_after < (deadline or self.deadline):
+                result = await self._ahedged(payload, deadline_at)
+            else:
+                result = await self._apost(payload, deadline_at)
+        except Exception as exc:
+            self._finish(exc)
+            raise
+        self._finish(None)
+        return result
+
+    async def aclose(self):
+        """Close this event loop's client; call it before the loop shuts down."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def close_async(self):
+        # clients of loops that are already closed can't be awaited; drop them
+        for loop, client in list(self._async_clients.items()):
+            self._async_clients.pop(loop, None)
+            if loop.is_closed():
+                continue
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            else:
+                loop.run_until_complete(client.aclose())
+
+    def close(self):
+        self._client.close()
+        self.close_async()
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+
+
+class AsyncSearchAPI:
+    """AsyncTavilyClient-shaped view of a SearchClient (shares its breaker)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def search(self, query: str, **params):
+        return await self.client.asearch(query, **params)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    def close(self):
+        # only the async side: the sync client may still be in use
+        self.client.close_async()
+
+
+# =============================
+# SINGLETON
+# =============================
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_search_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SearchClient(api_key=os.getenv("TAVILY_API_KEY"))
+                instrumentation.register_collector("search_client", _client.metrics)
+    return _client
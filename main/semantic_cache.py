@@ -0,0 +1,263 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from main import instrumentation
+from main.context import has_answer
+from main.search_cache import TTL_BY_CLASS, normalize_query, query_class
+
+# =============================
+# CONFIG
+# =============================
+
+ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "1") == "1"
+# cosine similarity between question embeddings needed for a hit
+THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+TTL = int(os.getenv("SEMANTIC_CACHE_TTL", str(24 * 60 * 60)))
+# answers carrying a travel advisory live no longer than the advisory search
+ADVISORY_TTL = min(TTL, TTL_BY_CLASS["advisory"])
+MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "2000"))
+
+# intents whose answers may be reused; emergency is never cached
+INTENTS = set(
+    os.getenv(
+        "SEMANTIC_CACHE_INTENTS",
+        "itinerary,visa,hotel,comparison,attraction,general",
+    ).split(",")
+)
+BYPASS_INTENTS = {"emergency"}
+
+# after an embedding error the cache is skipped for this long, doubling
+# on each further error
+RETRY_AFTER = 1.0
+MAX_RETRY_AFTER = 300.0
+
+stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0, "errors": 0}
+
+log = logging.getLogger(__name__)
+
+instrumentation.register_collector("semantic_cache", lambda: stats)
+
+
+def _slot(value):
+    return normalize_query(str(value)) if value not in (None, "") else None
+
+
+def bucket_key(state):
+    """Answers are only shared between questions with identical slots."""
+    places = sorted(p for p in (_slot(state.get("place1")), _slot(state.get("place2"))) if p)
+    return (
+        state.get("intent"),
+        _slot(state.get("destination")),
+        state.get("days"),
+        _slot(state.get("budget_type")),
+        tuple(places),
+    )
+
+
+def cacheable(state) -> bool:
+    intent = state.get("intent")
+    if not (
+        ENABLED
+        and state.get("is_travel_related", False)
+        and intent in INTENTS
+        and intent not in BYPASS_INTENTS
+    ):
+        return False
+    # the cache is shared across users and ignores history: a follow-up
+    # ("make it cheaper") must not get someone else's first-turn answer
+    return not has_answer(state.get("messages", []))
+
+
+def ttl_for(state, question):
+    # itinerary answers embed the risk node's advisory search
+    if state.get("intent") == "itinerary" or query_class(normalize_query(question)) == "advisory":
+        return ADVISORY_TTL
+    return TTL
+
+
+# =============================
+# CACHE
+# =============================
+# Slots pick the bucket (a coarse partition, like the lists of an IVF
+# index); inside it the question vectors are scanned with one matrix
+# product. Buckets stay small, so the scan is a few microseconds.
+
+
+class _Bucket:
+    def __init__(self, dim):
+        self.ids = []
+        self.vectors = np.empty((0, dim), dtype=np.float32)
+
+    def add(self, entry_id, vector):
+        self.ids.append(entry_id)
+        self.vectors = np.vstack([self.vectors, vector[None, :]])
+
+    def remove(self, entry_id):
+        i = self.ids.index(entry_id)
+        del self.ids[i]
+        self.vectors = np.delete(self.vectors, i, axis=0)
+
+    def nearest(self, vector):
+        if not self.ids:
+            return None, 0.0
+        sims = self.vectors @ vector
+        best = int(np.argmax(sims))
+        return self.ids[best], float(sims[best])
+
+
+class SemanticCache:
+    def __init__(self, embed, threshold=THRESHOLD, ttl=TTL, max_entries=MAX_ENTRIES):
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._buckets = {}
+        # entry id -> (bucket key, answer, expires_at), oldest use first
+        self._entries = OrderedDict()
+        self._next_id = 0
+
+    def _vector(self, question):
+        vector = np.asarray(self.embed(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _drop(self, entry_id):
+        key, _, _ = self._entries.pop(entry_id)
+        bucket = self._buckets[key]
+        bucket.remove(entry_id)
+        if not bucket.ids:
+            del self._buckets[key]
+
+    def lookup(self, key, question):
+        vector = self._vector(question)
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            entry_id, similarity = bucket.nearest(vector) if bucket else (None, 0.0)
+
+            if entry_id is None or similarity < self.threshold:
+                stats["misses"] += 1
+                return None
+
+            _, answer, expires_at = self._entries[entry_id]
+            if expires_at < time.time():
+                self._drop(entry_id)
+                stats["expired"] += 1
+                stats["misses"] += 1
+                return None
+
+            self._entries.move_to_end(entry_id)
+            stats["hits"] += 1
+            return answer
+
+    def store(self, key, question, answer, ttl=None):
+        vector = self._vector(question)
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = _Bucket(len(vector))
+
+            # a near-identical question already cached: refresh it in place
+            entry_id, similarity = bucket.nearest(vector)
+            if entry_id is not None and similarity >= self.threshold:
+                self._drop(entry_id)
+                bucket = self._buckets.setdefault(key, _Bucket(len(vector)))
+
+            entry_id = self._next_id
+            self._next_id += 1
+            bucket.add(entry_id, vector)
+            self._entries[entry_id] = (key, answer, time.time() + (self.ttl if ttl is None else ttl))
+            stats["stores"] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# =============================
+# MODULE API
+# =============================
+# The embedding model is shared with the retriever (and its query cache),
+# so a question is embedded once for the classifier, the cache and the
+# knowledge base.
+
+_cache = None
+_cache_lock = threading.Lock()
+_retry_at = 0.0
+_retry_after = RETRY_AFTER
+
+
+def _embed(text):
+    import retriever
+
+    return retriever.embed_query(text)
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticCache(_embed)
+    return _cache
+
+
+def _available():
+    return time.monotonic() >= _retry_at
+
+
+def _failed(exc):
+    # e.g. no embedding model: run without the cache for a while, then retry
+    global _retry_at, _retry_after
+    stats["errors"] += 1
+    log.warning("semantic cache skipped for %.0fs: %s: %s", _retry_after, type(exc).__name__, exc)
+    _retry_at = time.monotonic() + _retry_after
+    _retry_after = min(_retry_after * 2, MAX_RETRY_AFTER)
+
+
+def _succeeded():
+    global _retry_after
+    _retry_after = RETRY_AFTER
+
+
+def lookup(state, question):
+    if not _available() or not cacheable(state):
+        return None
+    try:
+        answer = get_cache().lookup(bucket_key(state), question)
+    except Exception as exc:
+        _failed(exc)
+        return None
+    _succeeded()
+    return answer
+
+
+def store(state, question, answer):
+    if not _available() or not answer or not cacheable(state):
+        return
+    try:
+        get_cache().store(bucket_key(state), question, answer, ttl_for(state, question))
+    except Exception as exc:
+        _failed(exc)
+        return
+    _succeeded()
+
+
+def hit_rate():
+    total = stats["hits"] + stats["misses"]
+    return stats["hits"] / total if total else 0.0
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+
+from langchain_core.messages import AIMessageChunk, HumanMessage
+
+from main.agent import get_graph, graph
+
+# nodes whose LLM tokens are forwarded to the client as they arrive
+TOKEN_NODES = {"itinerary", "executor"}
+# nodes whose message update is the final answer
+ANSWER_NODES = {"combine", "executor", "direct_answer", "cached_answer", "non_travel"}
+
+STREAM_MODES = ["messages", "custom", "updates"]
+
+# =============================
+# TIME TO FIRST TOKEN
+# =============================
+
+_ttft = {}
+_ttft_lock = threading.Lock()
+TTFT_WINDOW = 1000
+
+
+def _record_ttft(intent, seconds):
+    with _ttft_lock:
+        _ttft.setdefault(intent or "unknown", deque(maxlen=TTFT_WINDOW)).append(seconds)
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def ttft_report():
+    """p50/p95 time-to-first-token (seconds) per intent over the recent window."""
+    with _ttft_lock:
+        return {
+            intent: {
+                "count": len(values),
+                "p50": _percentile(values, 0.50),
+                "p95": _percentile(values, 0.95),
+            }
+            for intent, values in _ttft.items()
+            if values
+        }
+
+
+# =============================
+# EVENT TRANSLATION
+# =============================
+# Graph chunks become plain dict events:
+#   {"type": "intent",  "intent": ...}
+#   {"type": "token",   "node": ..., "text": ...}
+#   {"type": "section", "section": "itinerary" | "budget" | "risk", "text": ...}
+#   {"type": "answer",  "text": ...}
+#   {"type": "done",    "intent": ..., "ttft": ..., "total": ...}
+
+
+class _Run:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first = None
+        self.intent = None
+
+    def _mark(self):
+        if self.first is None:
+            self.first = time.perf_counter() - self.start
+
+    def events(self, mode, chunk):
+        if mode == "messages":
+            message, metadata = chunk
+            if (
+                isinstance(message, AIMessageChunk)
+                and message.content
+                and metadata.get("langgraph_node") in TOKEN_NODES
+            ):
+                self._mark()
+                yield {"type": "token", "node": metadata["langgraph_node"], "text": message.content}
+
+        elif mode == "custom":
+            if isinstance(chunk, dict) and "section" in chunk:
+                self._mark()
+                yield {"type": "section", "section": chunk["section"], "text": chunk["text"]}
+
+        elif mode == "updates":
+            for node, update in chunk.items():
+                if not update:
+                    continue
+                if node == "classify":
+                    self.intent = update.get("intent") if update.get("is_travel_related") else "non_travel"
+                    yield {"type": "intent", "intent": self.intent}
+                elif node in ANSWER_NODES and update.get("messages"):
+                    self._mark()
+                    yield {"type": "answer", "text": update["messages"][-1].content}
+
+    def done(self):
+        total = time.perf_counter() - self.start
+        ttft = self.first if self.first is not None else total
+        _record_ttft(self.intent, ttft)
+        return {"type": "done", "intent": self.intent, "ttft": ttft, "total": total}
+
+
+def _inputs(question_or_state):
+    if isinstance(question_or_state, str):
+        return {"messages": [HumanMessage(content=question_or_state)]}
+    return question_or_state
+
+
+def _graph(config):
+    # without a thread_id there is no conversation to checkpoint
+    if (config or {}).get("configurable", {}).get("thread_id") is None:
+        return graph
+    return get_graph()
+
+
+def stream_answer(question_or_state, config=None):
+    """Stream answer events for one turn (sync)."""
+    run = _Run()
+    for mode, chunk in _graph(config).stream(_inputs(question_or_state), config, stream_mode=STREAM_MODES):
+        yield from run.events(mode, chunk)
+    yield run.done()
+
+
+async def astream_answer(question_or_state, config=None):
+    """Stream answer events for one turn on the event loop."""
+    run = _Run()
+    async for mode, chunk in _graph(config).astream(_inputs(question_or_state), config, stream_mode=STREAM_MODES):
+        for event in run.events(mode, chunk):
+            yield event
+    yield run.done()
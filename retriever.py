@@ -1,6 +1,8 @@
+import math
 import os
-from langchain_community.vectorstores import FAISS
-from langchain_huggingface import HuggingFaceEmbeddings
+import threading
+import time
+from functools import lru_cache
 
 # ==============================
 # PATH CONFIG
@@ -8,28 +10,123 @@ from langchain_huggingface import HuggingFaceEmbeddings
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 FAISS_PATH = os.path.join(BASE_DIR, "faiss_index")
+# "auto" uses faiss_compact/ when present, "pickle" forces the langchain store
+KB_FORMAT = os.getenv("KB_FORMAT", "auto")
+
+TOP_K = int(os.getenv("KB_TOP_K", "4"))
+# minimum relevance (0..1) of the best chunk before we trust the knowledge base
+RELEVANCE_THRESHOLD = float(os.getenv("KB_RELEVANCE_THRESHOLD", "0.5"))
+# with no index on disk, look again after this many seconds
+MISSING_RECHECK = float(os.getenv("KB_MISSING_RECHECK", "60"))
 
 # ==============================
 # EMBEDDINGS
 # ==============================
 
-embeddings = HuggingFaceEmbeddings(
-    model_name="sentence-transformers/all-MiniLM-L6-v2"
-)
+# The model (and torch behind it) loads on first use, not on import.
+
+@lru_cache(maxsize=None)
+def get_embeddings():
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(
+        model_name="sentence-transformers/all-MiniLM-L6-v2"
+    )
+
+
+def __getattr__(name):
+    # keeps `retriever.embeddings` working for existing callers
+    if name == "embeddings":
+        return get_embeddings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=2048)
+def embed_query(text: str):
+    # cached so every consumer of the same question embeds it only once
+    return tuple(get_embeddings().embed_query(text))
 
 # ==============================
 # LOAD VECTOR STORE
 # ==============================
 
 def load_vector_store():
-    if not os.path.exists(FAISS_PATH):
+    import compact_index
+
+    # check for an index before loading the embedding model
+    compact = KB_FORMAT in ("auto", "compact") and compact_index.exists()
+    if not compact and not os.path.exists(FAISS_PATH):
         raise FileNotFoundError(
             f"FAISS index not found at {FAISS_PATH}. "
             f"Run build_index.py first."
         )
 
+    embeddings = get_embeddings()
+
+    # prefer the mmap-backed compact format written by build_index.py
+    if compact:
+        return compact_index.CompactVectorStore(embeddings)
+
+    from langchain_community.vectorstores import FAISS
+
     return FAISS.load_local(
         FAISS_PATH,
         embeddings,
         allow_dangerous_deserialization=True
     )
+
+
+_vector_store = None
+_vector_store_lock = threading.Lock()
+_missing_until = 0.0
+
+
+def get_vector_store():
+    # one store per process, shared by every request; a missing index is
+    # remembered so requests don't keep probing for it
+    global _vector_store, _missing_until
+    if _vector_store is None:
+        with _vector_store_lock:
+            if _vector_store is None:
+                if time.monotonic() < _missing_until:
+                    raise FileNotFoundError(f"FAISS index not found at {FAISS_PATH}.")
+                try:
+                    _vector_store = load_vector_store()
+                except FileNotFoundError:
+                    _missing_until = time.monotonic() + MISSING_RECHECK
+                    raise
+    return _vector_store
+
+
+# ==============================
+# RETRIEVE
+# ==============================
+
+def relevance(distance: float) -> float:
+    # both stores return squared L2 distances between unit vectors; this is
+    # langchain's euclidean relevance, so thresholds carry over
+    return 1.0 - distance / math.sqrt(2)
+
+
+def retrieve(question: str, k: int = TOP_K):
+    store = get_vector_store()
+
+    # by vector, so the question's cached embedding is reused
+    hits = store.similarity_search_with_score_by_vector(
+        list(embed_query(question)), k=k
+    )
+    return [(doc, float(relevance(score))) for doc, score in hits]
+
+
+def retrieve_context(question: str, threshold: float = RELEVANCE_THRESHOLD):
+    """Return (context, top_score); context is None when the KB isn't relevant enough."""
+    hits = retrieve(question)
+    if not hits:
+        return None, 0.0
+
+    top_score = max(score for _, score in hits)
+    if top_score < threshold:
+        return None, top_score
+
+    context = "\n\n".join(doc.page_content for doc, score in hits if score >= threshold)
+    return context, top_score